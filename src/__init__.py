@@ -8,11 +8,28 @@ using a hybrid approach combining heuristics-based extraction and LLM fallback.
 __version__ = "2.0.0"
 __author__ = "Pietro Grazzioli Golfeto"
 
-# Package-level imports for convenience
-from .orchestration import extract_data_from_pdf
-from .heuristics.registry import run_heuristics
+import importlib
+
+# Package-level imports for convenience, resolved on first access so that importing a
+# submodule (e.g. src.heuristics in a batch worker process) does not also load the
+# LLM client stack behind src.orchestration
+_LAZY_EXPORTS = {
+    "extract_data_from_pdf": ".orchestration",
+    "run_heuristics": ".heuristics.registry",
+}
 
 __all__ = [
     "extract_data_from_pdf",
     "run_heuristics",
 ]
+
+
+def __getattr__(name):
+    """Import package-level exports on first access (PEP 562)."""
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        # Store it so later accesses are plain module attribute lookups
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
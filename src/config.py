@@ -18,6 +18,14 @@ PDF_CHUNK_SIZE = 4096  # Bytes for reading PDF files in chunks
 
 # Cache Configuration
 CACHE_ENABLED = True
+HEURISTICS_CACHE_SIZE = 1024  # Max schemas / field names whose rule plan and dispatch are memoized
+# Max run_heuristics results memoized per process. Entries are keyed by a digest of the
+# text, so documents themselves are not kept, but each entry holds its result dict for the
+# life of the process. Repeated PDFs are already served by GLOBAL_CACHE, so this stays small
+HEURISTICS_RESULT_CACHE_SIZE = 128
+HEURISTICS_BATCH_WORKERS = None  # Worker processes for run_heuristics_batch (None = one per CPU)
+HEURISTICS_BATCH_CHUNK_SIZE = 8  # Documents sent to a worker per round-trip
+HEURISTICS_BATCH_MIN_PARALLEL = 32  # Smaller batches run in-process (pool start-up costs more)
 
 # Logging Configuration
 LOG_LEVEL = "INFO"
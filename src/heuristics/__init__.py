@@ -5,6 +5,6 @@ This package contains all heuristics-based extraction rules organized by documen
 The registry module coordinates rule execution based on label matching.
 """
 
-from .registry import run_heuristics
+from .registry import run_heuristics, run_heuristics_batch, clear_heuristics_caches
 
-__all__ = ["run_heuristics"]
+__all__ = ["run_heuristics", "run_heuristics_batch", "clear_heuristics_caches"]
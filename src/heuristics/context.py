@@ -0,0 +1,40 @@
+"""
+Document Text Context Module
+
+Holds the text of one document together with its normalized variants.
+This module follows the Single Responsibility Principle by only managing
+per-document text normalization shared by the rule banks.
+"""
+
+from functools import cached_property
+
+
+class DocumentText:
+    """
+    Text of a single document, with normalized variants computed on demand.
+    
+    One instance is created per run_heuristics call and passed to every
+    extractor, so each variant is computed at most once per document, and
+    only if some rule actually asks for it.
+    
+    Attributes:
+        text: The extracted text from the PDF document
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+    
+    @cached_property
+    def upper(self) -> str:
+        """text.upper(), used for case-insensitive keyword checks."""
+        return self.text.upper()
+    
+    @cached_property
+    def upper_aligned(self) -> bool:
+        """
+        Whether offsets in upper match offsets in text.
+        
+        A few characters expand when upper-cased (e.g. 'ß' -> 'SS'); in that
+        case an index found in upper cannot be used to slice text.
+        """
+        return len(self.upper) == len(self.text)
@@ -5,59 +5,162 @@ Contains generic/adaptive "Prong 2" rules that work across different document ty
 These rules are applied as fallback when label-specific rules don't find a field.
 """
 
+import functools
 import re
-from typing import Dict, Any
+from typing import Callable, Optional
 
+from src.config import HEURISTICS_CACHE_SIZE
+from .context import DocumentText
 
-def run_generic_rules(text: str, schema_dict: Dict[str, str], results: Dict[str, Any]) -> None:
+
+# Pre-compiled patterns (compiled once at import time instead of on every call).
+# Word-start checks sit in a lookbehind after the first digit (see label_oab), so the
+# engine only tries offsets holding a digit
+_CPF_UNFORMATTED_RE = re.compile(r'([0-9](?<!\w[0-9])[0-9]{10})\b')
+_TELEFONE_PAREN_RE = re.compile(r'\([0-9]{2}\)\s*[0-9]{4,5}-[0-9]{4}')
+_TELEFONE_SPACED_RE = re.compile(r'[0-9](?<!\w[0-9])[0-9]\s+[0-9]{4,5}-[0-9]{4}\b')
+_TELEFONE_DIGITS_RE = re.compile(r'[0-9](?<!\w[0-9])[0-9]{9,10}\b')
+
+
+@functools.lru_cache(maxsize=HEURISTICS_CACHE_SIZE)
+def resolve_generic_extractor(
+    field_name: str,
+    description: str
+) -> Optional[Callable[[DocumentText], Optional[str]]]:
+    """
+    Decide which generic rule (if any) a schema field triggers.
+    
+    Schemas repeat across documents, so the keyword scans over the field name
+    and description run once per distinct field instead of once per document.
+    
+    Args:
+        field_name: Schema field name
+        description: Schema field description
+        
+    Returns:
+        Extractor taking the DocumentText and returning the value or None,
+        or None if no generic rule applies (CPF, telefone and data are checked in that order)
+    """
+    field_upper = field_name.upper()
+    description_upper = description.upper()
+    
+    # Generic Rule 1: CPF (Brazilian taxpayer ID) - Adaptive formats
+    if 'CPF' in field_upper or 'CPF' in description_upper or 'XXX.XXX.XXX-X' in description:
+        return _extract_cpf
+    # Generic Rule 2: Telefone (Phone) - Triggered by description or field name
+    if 'TELEFONE' in field_upper or 'TELEFONE' in description_upper:
+        return _extract_telefone
+    # Generic Rule 3: Data (Date) - Only formatted dates with slashes
+    if 'DATA' in field_upper or 'DD/MM/YYYY' in description_upper or 'DATE' in description_upper:
+        return _extract_data
+    return None
+
+
+def _extract_cpf(doc: DocumentText) -> Optional[str]:
+    """Generic Rule 1: formatted CPF, else 11 continuous digits."""
+    # Try formatted CPF first (XXX.XXX.XXX-XX)
+    value = _find_formatted_cpf(doc.text)
+    if value is None:
+        # Try unformatted CPF (11 continuous ASCII digits)
+        match = _CPF_UNFORMATTED_RE.search(doc.text)
+        if match:
+            value = match.group(1).strip()
+    return value
+
+
+def _extract_telefone(doc: DocumentText) -> Optional[str]:
+    """Generic Rule 2: first phone number, only when the document mentions "Telefone"."""
+    if 'TELEFONE' not in doc.upper:
+        return None
+    # Try multiple phone patterns
+    match = _TELEFONE_PAREN_RE.search(doc.text)
+    if not match:
+        match = _TELEFONE_SPACED_RE.search(doc.text)
+    if not match:
+        match = _TELEFONE_DIGITS_RE.search(doc.text)
+    return match.group(0).strip() if match else None
+
+
+def _extract_data(doc: DocumentText) -> Optional[str]:
+    """Generic Rule 3: first DD/MM/YYYY date, else the first DD/MM/YY date."""
+    # Try DD/MM/YYYY (with slashes, 4-digit year)
+    value = _find_slash_date(doc.text, year_digits=4)
+    if value is None:
+        # Try DD/MM/YY (with slashes, 2-digit year)
+        value = _find_slash_date(doc.text, year_digits=2)
+    return value
+
+
+def _is_word_char(char: str) -> bool:
+    """Return True if char counts as a word character for the regex \\b assertion."""
+    return char.isalnum() or char == '_'
+
+
+def _find_formatted_cpf(text: str) -> Optional[str]:
+    """
+    Find the first CPF in XXX.XXX.XXX-XX format.
+    
+    Equivalent to re.search(r'\\b([0-9]{3}\\.[0-9]{3}\\.[0-9]{3}-[0-9]{2})\\b', text), but
+    implemented as a fixed-shape check around each '-' found with str.find.
+    Only offsets holding the rare separator are inspected, instead of running
+    the regex matcher at every position of the text.
+    
+    Args:
+        text: Extracted text from PDF
+        
+    Returns:
+        The CPF string, or None if no formatted CPF is present
+    """
+    text_length = len(text)
+    dash = text.find('-', 11)
+    while dash != -1 and dash + 3 <= text_length:
+        start = dash - 11
+        end = dash + 3
+        if (text[start + 3] == '.' and text[start + 7] == '.'
+                and text[start:end].isascii()
+                and text[start:start + 3].isdecimal()
+                and text[start + 4:start + 7].isdecimal()
+                and text[start + 8:dash].isdecimal()
+                and text[dash + 1:end].isdecimal()
+                and (start == 0 or not _is_word_char(text[start - 1]))
+                and (end == text_length or not _is_word_char(text[end]))):
+            return text[start:end]
+        dash = text.find('-', dash + 1)
+    return None
+
+
+def _find_slash_date(text: str, year_digits: int) -> Optional[str]:
     """
-    Apply generic heuristics rules for fields not found by label-specific rules.
+    Find the first DD/MM/YYYY (or DD/MM/YY) date.
     
-    These are adaptive rules that work across different document types:
-    - CPF (Brazilian taxpayer ID)
-    - Phone numbers
-    - Dates
+    Equivalent to re.search(r'\\b([0-9]{2}/[0-9]{2}/[0-9]{N})\\b', text) with N = year_digits,
+    implemented as a fixed-shape check around each '/' found with str.find.
+    Day and month are read at fixed offsets and range-checked (01-31, 01-12),
+    so strings like '32/13/2024' are skipped.
     
     Args:
         text: Extracted text from PDF
-        schema_dict: Schema mapping field names to descriptions
-        results: Current extraction results (modified in place)
+        year_digits: Number of year digits to require (4 or 2)
         
     Returns:
-        Updated results dictionary
+        The date string, or None if no date in that format is present
     """
-    for field_name, description in schema_dict.items():
-        # Only apply generic rules if field wasn't found by label-specific rules
-        if results[field_name] is None:
-            
-            # Generic Rule 1: CPF (Brazilian taxpayer ID) - Adaptive formats
-            if 'CPF' in field_name.upper() or 'CPF' in description.upper() or 'XXX.XXX.XXX-X' in description:
-                # Try formatted CPF first (XXX.XXX.XXX-XX)
-                match = re.search(r'\b(\d{3}\.\d{3}\.\d{3}-\d{2})\b', text)
-                if not match:
-                    # Try unformatted CPF (11 continuous digits)
-                    match = re.search(r'\b(\d{11})\b', text)
-                if match:
-                    results[field_name] = match.group(1).strip()
-            
-            # Generic Rule 2: Telefone (Phone) - Triggered by description or field name
-            elif 'TELEFONE' in field_name.upper() or 'TELEFONE' in description.upper():
-                if re.search(r'TELEFONE', text, re.IGNORECASE):
-                    # Try multiple phone patterns
-                    match = re.search(r'\(\d{2}\)\s*\d{4,5}-\d{4}', text)
-                    if not match:
-                        match = re.search(r'\b\d{2}\s+\d{4,5}-\d{4}\b', text)
-                    if not match:
-                        match = re.search(r'\b\d{10,11}\b', text)
-                    if match:
-                        results[field_name] = match.group(0).strip()
-            
-            # Generic Rule 3: Data (Date) - Only formatted dates with slashes
-            elif 'DATA' in field_name.upper() or 'DD/MM/YYYY' in description.upper() or 'DATE' in description.upper():
-                # Try DD/MM/YYYY (with slashes, 4-digit year)
-                match = re.search(r'\b(\d{2}/\d{2}/\d{4})\b', text)
-                if not match:
-                    # Try DD/MM/YY (with slashes, 2-digit year)
-                    match = re.search(r'\b(\d{2}/\d{2}/\d{2})\b', text)
-                if match:
-                    results[field_name] = match.group(1).strip()
+    text_length = len(text)
+    slash = text.find('/', 2)
+    while slash != -1:
+        start = slash - 2
+        end = slash + 4 + year_digits
+        if end > text_length:
+            return None
+        if (text[slash + 3] == '/'
+                and text[start:end].isascii()
+                and text[start:slash].isdecimal()
+                and text[slash + 1:slash + 3].isdecimal()
+                and text[slash + 4:end].isdecimal()
+                and (start == 0 or not _is_word_char(text[start - 1]))
+                and (end == text_length or not _is_word_char(text[end]))
+                and 1 <= int(text[start:slash]) <= 31
+                and 1 <= int(text[slash + 1:slash + 3]) <= 12):
+            return text[start:end]
+        slash = text.find('/', slash + 1)
+    return None
@@ -5,184 +5,336 @@ Contains 8 optimized heuristics rules for Brazilian lawyer ID cards (Carteira da
 This module follows the Single Responsibility Principle by only handling OAB document extraction.
 """
 
+import functools
 import re
-from typing import Dict, Any
+from typing import Callable, Optional
 
+from src.config import HEURISTICS_CACHE_SIZE
+from .context import DocumentText
 
-def run_oab_rules(text: str, schema_dict: Dict[str, str], results: Dict[str, Any]) -> None:
+
+# Pre-compiled patterns (compiled once at import time instead of on every call)
+# The word-start check is a lookbehind after the first character rather than a leading \b:
+# a pattern that starts with a character class lets the regex engine skip positions
+# that cannot start a match (non-letters for nome, non-digits for the numeric rules)
+# without entering the matcher.
+# Numeric fields (inscricao, telefone, CPF) are ASCII-only, so they use [0-9]: a plain
+# range test, where \d runs a Unicode decimal lookup for every character it checks
+_NOME_RE = re.compile(r"([A-ZÀ-Ú](?<!\w[A-ZÀ-Ú])[A-ZÀ-Ú]*(?:[ '][A-ZÀ-Ú]+)*)\b")
+_INSCRICAO_RE = re.compile(r'([0-9](?<!\w[0-9])[0-9]{5})\b')
+# The 27 Brazilian state codes (UFs); both seccional patterns accept only these
+_UF_CODES = (
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO',
+)
+_UF_ALTERNATION = '|'.join(_UF_CODES)
+_SECCIONAL_CONSELHO_RE = re.compile(
+    r'CONSELHO SECCIONAL[\s\-]+(' + _UF_ALTERNATION + r')\b', re.IGNORECASE
+)
+_UF_RE = re.compile(r'\b(' + _UF_ALTERNATION + r')\b')
+# The state name runs to the end of its line; a CR before the line break (CRLF text) is
+# allowed, and the phrase may follow a label on the same line. The dash form (hyphen or
+# en-dash) is searched first, the space-separated form is the fallback
+_SUBSECAO_DASH_RE = re.compile(
+    r'CONSELHO\s+SECCIONAL\s*[-–]\s*([A-ZÀ-Ú][A-ZÀ-Ú \t]*?)[ \t\r]*$',
+    re.MULTILINE | re.IGNORECASE
+)
+_SUBSECAO_SPACE_RE = re.compile(
+    r'CONSELHO\s+SECCIONAL\s+([A-ZÀ-Ú][A-ZÀ-Ú \t]*?)[ \t\r]*$',
+    re.MULTILINE | re.IGNORECASE
+)
+# Keywords factored by shared prefix (ADVOGAD[OA], ESTAGIARI[OA]) so each offset is
+# tested against three branches instead of five
+_CATEGORIA_RE = re.compile(r'\b(ADVOGAD[OA]|SUPLEMENTAR|ESTAGIARI[OA])\b', re.IGNORECASE)
+# Only the "ENDEREÇO Profissional" header is a regex; the three address lines after it
+# are walked with str.find (see _find_endereco)
+_ENDERECO_HEADER_RE = re.compile(r'ENDERE[CÇ]O\s+Profissional\s*\n', re.IGNORECASE)
+_ENDERECO_STREET_START_RE = re.compile(r'[A-ZÀ-Ú0-9]', re.IGNORECASE)
+_ENDERECO_CITY_START_RE = re.compile(r'[A-ZÀ-Ú]', re.IGNORECASE)
+_TELEFONE_PAREN_RE = re.compile(r'\([0-9]{2}\)\s*[0-9]{4,5}-[0-9]{4}')
+_TELEFONE_SPACED_RE = re.compile(r'[0-9](?<!\w[0-9])[0-9]\s+[0-9]{4,5}-[0-9]{4}\b')
+_TELEFONE_DIGITS_RE = re.compile(r'[0-9](?<!\w[0-9])[0-9]{9,10}\b')
+_SITUACAO_RE = re.compile(r'SITUA[CÇ](?:A[OÃ]|Ã[OÃ])\s+([A-ZÀ-Ú]+)', re.IGNORECASE)
+
+# Literal prefixes of the categoria keywords, used to skip the regex when none is present
+_CATEGORIA_ANCHORS = ('SUPLEMENTAR', 'ADVOGAD', 'ESTAGIARI')
+# Full categoria keywords, looked up with str.find on the upper-cased text
+_CATEGORIA_KEYWORDS = ('SUPLEMENTAR', 'ADVOGADO', 'ADVOGADA', 'ESTAGIARIO', 'ESTAGIARIA')
+# Characters after a "Telefone" label searched for its number (label and value sit on
+# adjacent lines); the window is extended to the end of the line it stops in
+_TELEFONE_WINDOW = 120
+
+
+@functools.lru_cache(maxsize=HEURISTICS_CACHE_SIZE)
+def resolve_oab_extractor(field_name: str) -> Optional[Callable[[DocumentText], Optional[str]]]:
     """
-    Apply OAB-specific heuristics rules to extract field values.
+    Pick the OAB rule that handles a schema field.
     
-    This function modifies the results dictionary in-place.
-    Contains 8 specialized rules for Brazilian lawyer ID cards.
+    Rules are triggered by the field name only. The result is cached, so the
+    keyword checks run once per distinct field name rather than per document.
+    
+    Args:
+        field_name: Schema field name
+    
+    Returns:
+        Extractor taking the DocumentText and returning the value or None,
+        or None if no OAB rule applies to the field
+    """
+    field_name_lower = field_name.lower()
+    
+    # OAB Rule 1: Nome (Name) - Uppercase names
+    if 'nome' in field_name_lower:
+        return _extract_nome
+    
+    # OAB Rule 2: Inscricao (Registration) - 6 digits
+    elif ('inscricao' in field_name_lower or 'inscriçao' in field_name_lower or
+          'inscriçâo' in field_name_lower or 'oab' in field_name_lower):
+        return _extract_inscricao
+    
+    # OAB Rule 3: Seccional (State section) - 2-letter state code
+    elif 'seccional' in field_name_lower:
+        return _extract_seccional
+    
+    # OAB Rule 4: Subsecao (Subsection) - Full state name after "CONSELHO SECCIONAL"
+    elif 'subsec' in field_name_lower or 'subseç' in field_name_lower:
+        return _extract_subsecao
+    
+    # OAB Rule 5: Categoria (Category) - Professional status keywords
+    elif 'categoria' in field_name_lower:
+        return _extract_categoria
+    
+    # OAB Rule 6: Endereco (Address) - Multi-line address after "ENDEREÇO Profissional"
+    elif 'endereco' in field_name_lower or 'endereço' in field_name_lower:
+        return _extract_endereco
+    
+    # OAB Rule 7: Telefone (Phone) - Brazilian phone formats or None if keyword exists
+    elif 'telefone' in field_name_lower:
+        return _extract_telefone
+    
+    # OAB Rule 8: Situacao (Status) - Status after "SITUAÇÃO"
+    elif 'situacao' in field_name_lower or 'situação' in field_name_lower:
+        return _extract_situacao
+    
+    return None
+
+
+def _extract_nome(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 1: first run of uppercase words on a line."""
+    match = _NOME_RE.search(doc.text)
+    return match.group(1).strip() if match else None
+
+
+def _extract_inscricao(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 2: first standalone 6-digit number."""
+    match = _INSCRICAO_RE.search(doc.text)
+    return match.group(1).strip() if match else None
+
+
+def _extract_seccional(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 3: state code after "CONSELHO SECCIONAL", else the first state code."""
+    # Both patterns require the "Seccional" keyword
+    if 'SECCIONAL' not in doc.upper:
+        return None
+    # Try pattern 1: After "CONSELHO SECCIONAL" (searched from the first occurrence,
+    # and skipped when the phrase is absent)
+    match = None
+    conselho_idx = doc.upper.find('CONSELHO SECCIONAL') if doc.upper_aligned else 0
+    if conselho_idx != -1:
+        match = _SECCIONAL_CONSELHO_RE.search(doc.text, conselho_idx)
+    if not match:
+        # Try pattern 2: Standalone state code
+        match = _UF_RE.search(doc.text)
+    return match.group(1).strip() if match else None
+
+
+def _extract_subsecao(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 4: state name on the "CONSELHO SECCIONAL" line."""
+    if 'SECCIONAL' not in doc.upper:
+        return None
+    # A match starts at a "CONSELHO", so begin at the first one
+    search_start = 0
+    if doc.upper_aligned:
+        search_start = max(doc.upper.find('CONSELHO'), 0)
+    # Pattern 1: with dash (hyphen or en-dash)
+    match = _SUBSECAO_DASH_RE.search(doc.text, search_start)
+    if not match:
+        # Pattern 2: without dash
+        match = _SUBSECAO_SPACE_RE.search(doc.text, search_start)
+    return match.group(1).strip() if match else None
+
+
+def _extract_categoria(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 5: first professional category keyword."""
+    if not any(anchor in doc.upper for anchor in _CATEGORIA_ANCHORS):
+        return None
+    return _find_categoria(doc.text, doc.upper)
+
+
+def _extract_endereco(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 6: the three lines after "ENDEREÇO Profissional"."""
+    if 'ENDERE' not in doc.upper:
+        return None
+    # Headers start at an "ENDERE", so skip the text before the first one
+    start = doc.upper.find('ENDERE') if doc.upper_aligned else 0
+    return _find_endereco(doc.text, start)
+
+
+def _extract_telefone(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 7: phone number after a "Telefone" label (None if there is no number)."""
+    if 'TELEFONE' not in doc.upper:
+        return None
+    return _find_telefone(doc.text, doc.upper)
+
+
+def _extract_situacao(doc: DocumentText) -> Optional[str]:
+    """OAB Rule 8: status word after "SITUAÇÃO"."""
+    situacao_start = doc.upper.find('SITUA')
+    if situacao_start == -1:
+        return None
+    # Start the regex at the first keyword occurrence instead of offset 0
+    # (offsets are only shared when upper-casing kept the text length)
+    if not doc.upper_aligned:
+        situacao_start = 0
+    match = _SITUACAO_RE.search(doc.text, situacao_start)
+    return match.group(1).strip() if match else None
+
+
+def _find_telefone(text: str, text_upper: str) -> Optional[str]:
+    """
+    Find the phone number that follows a "Telefone" label.
+    
+    Each label occurrence is tried in order, and the phone patterns only search
+    the window of roughly _TELEFONE_WINDOW characters after it (pattern.search
+    with pos/endpos), so a number printed after the label wins over an earlier
+    one. When no label is followed by a number this returns None, and the
+    generic telefone rule still scans the whole document as the fallback, so a
+    number printed before the label can be returned then.
     
     Args:
         text: The extracted text from the PDF document
-        schema_dict: Dictionary mapping field names to their descriptions
-        results: Dictionary to store extracted values (modified in-place)
+        text_upper: text.upper()
+    
+    Returns:
+        The phone number, or None if no label is followed by one
+    """
+    if len(text_upper) != len(text):
+        # Upper-cased offsets do not line up with text, search the whole document
+        windows = [(0, len(text))]
+    else:
+        windows = []
+        label_idx = text_upper.find('TELEFONE')
+        while label_idx != -1:
+            # Ending the window at a line break never cuts a number in half
+            window_end = text.find('\n', label_idx + _TELEFONE_WINDOW)
+            windows.append((label_idx, window_end if window_end != -1 else len(text)))
+            label_idx = text_upper.find('TELEFONE', label_idx + 1)
+    
+    for start, end in windows:
+        # Try multiple phone patterns
+        match = _TELEFONE_PAREN_RE.search(text, start, end)
+        if not match:
+            match = _TELEFONE_SPACED_RE.search(text, start, end)
+        if not match:
+            match = _TELEFONE_DIGITS_RE.search(text, start, end)
+        if match:
+            return match.group(0).strip()
+    return None
+
+
+def _find_endereco(text: str, start: int = 0) -> Optional[str]:
     """
-    # OAB-SPECIFIC RULE BANK (8 rules for OAB ID card fields)
-    # Triggered for any label containing 'oab'
+    Find the address block that follows an "ENDEREÇO Profissional" header.
     
-    for field_name, description in schema_dict.items():
-        # Only apply if field not already found
-        if results[field_name] is not None:
+    The block is a street line (starting with a letter or digit), a city line (starting
+    with a letter), both at least two characters long, then a line starting with the CEP
+    digits. Headers whose following lines do not fit are skipped.
+    
+    Args:
+        text: Original document text
+        start: Offset to start looking for headers at
+    
+    Returns:
+        The street line, city line and CEP joined by newlines, or None
+    """
+    for header in _ENDERECO_HEADER_RE.finditer(text, start):
+        # STEP 1: Street line (full line, followed by a newline)
+        street_start = header.end()
+        street_end = text.find('\n', street_start)
+        if street_end - street_start < 2 or not _ENDERECO_STREET_START_RE.match(text, street_start):
             continue
         
-        # OAB Rule 1: Nome (Name) - Uppercase names
-        if 'nome' in field_name.lower():
-            match = re.search(r'\b([A-ZÀ-Ú]+(?:[\s\'][A-ZÀ-Ú]+)*)\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 2: Inscricao (Registration) - 6 digits
-        elif ('inscricao' in field_name.lower() or 'inscriçao' in field_name.lower() or 
-              'inscriçâo' in field_name.lower() or 'oab' in field_name.lower()):
-            match = re.search(r'\b(\d{6})\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 3: Seccional (State section) - 2-letter state code
-        elif 'seccional' in field_name.lower():
-            # Try pattern 1: After "CONSELHO SECCIONAL"
-            match = re.search(r'CONSELHO SECCIONAL[\s\-]+([A-Z]{2})\b', text, re.IGNORECASE)
-            if not match:
-                # Try pattern 2: Standalone state code
-                if re.search(r'Seccional', text, re.IGNORECASE):
-                    match = re.search(r'\b(AC|AL|AP|AM|BA|CE|DF|ES|GO|MA|MT|MS|MG|PA|PB|PR|PE|PI|RJ|RN|RS|RO|RR|SC|SP|SE|TO)\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 4: Subsecao (Subsection) - Full state name after "CONSELHO SECCIONAL"
-        elif 'subsec' in field_name.lower() or 'subseç' in field_name.lower():
-            # Pattern 1: With dash
-            match = re.search(r'CONSELHO\s+SECCIONAL\s*[-–]\s*([A-ZÀ-Ú\s]+?)(?=\n)', text, re.IGNORECASE)
-            if not match:
-                # Pattern 2: Without dash
-                match = re.search(r'CONSELHO\s+SECCIONAL\s+([A-ZÀ-Ú\s]+?)(?=\n)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 5: Categoria (Category) - Professional status keywords
-        elif 'categoria' in field_name.lower():
-            match = re.search(r'\b(ADVOGADO|ADVOGADA|SUPLEMENTAR|ESTAGIARIO|ESTAGIARIA)\b', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 6: Endereco (Address) - Multi-line address after "ENDEREÇO Profissional"
-        elif 'endereco' in field_name.lower() or 'endereço' in field_name.lower():
-            match = re.search(r'ENDERE[CÇ]O\s+Profissional\s*\n([A-ZÀ-Ú0-9][^\n]+)\n([A-ZÀ-Ú][^\n]+)\n(\d+)', text, re.IGNORECASE)
-            if match:
-                address_parts = [match.group(1), match.group(2), match.group(3)]
-                results[field_name] = '\n'.join(address_parts).strip()
+        # STEP 2: City line (full line, followed by a newline)
+        city_start = street_end + 1
+        city_end = text.find('\n', city_start)
+        if city_end - city_start < 2 or not _ENDERECO_CITY_START_RE.match(text, city_start):
+            continue
         
-        # OAB Rule 7: Telefone (Phone) - Brazilian phone formats or None if keyword exists
-        elif 'telefone' in field_name.lower():
-            if re.search(r'TELEFONE', text, re.IGNORECASE):
-                # Try multiple phone patterns
-                match = re.search(r'\(\d{2}\)\s*\d{4,5}-\d{4}', text)
-                if not match:
-                    match = re.search(r'\b\d{2}\s+\d{4,5}-\d{4}\b', text)
-                if not match:
-                    match = re.search(r'\b\d{10,11}\b', text)
-                if match:
-                    results[field_name] = match.group(0).strip()
+        # STEP 3: CEP, the run of digits opening the next line
+        cep_start = cep_end = city_end + 1
+        while cep_end < len(text) and text[cep_end].isdecimal():
+            cep_end += 1
+        if cep_end == cep_start:
+            continue
         
-        # OAB Rule 8: Situacao (Status) - Status after "SITUAÇÃO"
-        elif 'situacao' in field_name.lower() or 'situação' in field_name.lower():
-            match = re.search(r'SITUA[CÇ](?:A[OÃ]|Ã[OÃ])\s+([A-ZÀ-Ú]+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
+        return text[street_start:cep_end]
+    return None
 
-import re
-from typing import Dict, Any
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    """
+    Check that text[start:end] is not glued to word characters on either side.
+    
+    Mirrors the regex \\b assertion (word characters are alphanumerics and '_').
+    
+    Args:
+        text: Text containing the candidate
+        start: Candidate start offset
+        end: Candidate end offset (exclusive)
+    
+    Returns:
+        True if both edges of the candidate are word boundaries
+    """
+    if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+        return False
+    if end < len(text) and (text[end].isalnum() or text[end] == '_'):
+        return False
+    return True
 
 
-def apply_oab_rules(
-    text: str,
-    schema_dict: Dict[str, str],
-    results: Dict[str, Any]
-) -> Dict[str, Any]:
+def _find_categoria(text: str, text_upper: str) -> Optional[str]:
     """
-    Apply OAB-specific heuristics rules.
+    Find the first categoria keyword as a whole word, case-insensitively.
     
-    Triggered for any label containing 'oab' (e.g., 'carteira_oab', 'documento_oab').
-    Contains 8 specialized rules for Brazilian lawyer ID card fields.
+    Uses exact str.find lookups on the upper-cased text instead of a
+    re.IGNORECASE search. The value is sliced from the original text, so
+    its case is preserved (e.g. 'Advogado').
     
     Args:
-        text: Extracted text from PDF
-        schema_dict: Schema mapping field names to descriptions
-        results: Current extraction results (modified in place)
-        
+        text: The extracted text from the PDF document
+        text_upper: text.upper()
+    
     Returns:
-        Updated results dictionary
+        The earliest keyword occurrence, or None if there is none
     """
-    for field_name, description in schema_dict.items():
-        
-        # OAB Rule 1: Nome (Name) - Uppercase names
-        if 'nome' in field_name.lower():
-            match = re.search(r'\b([A-ZÀ-Ú]+(?:[\s\'][A-ZÀ-Ú]+)*)\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 2: Inscricao (Registration) - 6 digits
-        elif ('inscricao' in field_name.lower() or 'inscriçao' in field_name.lower() or 
-              'inscriçâo' in field_name.lower() or 'oab' in field_name.lower()):
-            match = re.search(r'\b(\d{6})\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 3: Seccional (State section) - 2-letter state code
-        elif 'seccional' in field_name.lower():
-            # Try pattern 1: After "CONSELHO SECCIONAL"
-            match = re.search(r'CONSELHO SECCIONAL[\s\-]+([A-Z]{2})\b', text, re.IGNORECASE)
-            if not match:
-                # Try pattern 2: Standalone state code
-                if re.search(r'Seccional', text, re.IGNORECASE):
-                    match = re.search(r'\b(AC|AL|AP|AM|BA|CE|DF|ES|GO|MA|MT|MS|MG|PA|PB|PR|PE|PI|RJ|RN|RS|RO|RR|SC|SP|SE|TO)\b', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 4: Subsecao (Subsection) - Full state name after "CONSELHO SECCIONAL"
-        elif 'subsec' in field_name.lower() or 'subseç' in field_name.lower():
-            # Pattern 1: With dash
-            match = re.search(r'CONSELHO\s+SECCIONAL\s*[-–]\s*([A-ZÀ-Ú\s]+?)(?=\n)', text, re.IGNORECASE)
-            if not match:
-                # Pattern 2: Without dash
-                match = re.search(r'CONSELHO\s+SECCIONAL\s+([A-ZÀ-Ú\s]+?)(?=\n)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 5: Categoria (Category) - Professional status keywords
-        elif 'categoria' in field_name.lower():
-            match = re.search(r'\b(ADVOGADO|ADVOGADA|SUPLEMENTAR|ESTAGIARIO|ESTAGIARIA)\b', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # OAB Rule 6: Endereco (Address) - Multi-line address after "ENDEREÇO Profissional"
-        elif 'endereco' in field_name.lower() or 'endereço' in field_name.lower():
-            match = re.search(r'ENDERE[CÇ]O\s+Profissional\s*\n([A-ZÀ-Ú0-9][^\n]+)\n([A-ZÀ-Ú][^\n]+)\n(\d+)', text, re.IGNORECASE)
-            if match:
-                address_parts = [match.group(1), match.group(2), match.group(3)]
-                results[field_name] = '\n'.join(address_parts).strip()
-        
-        # OAB Rule 7: Telefone (Phone) - Brazilian phone formats or None if keyword exists
-        elif 'telefone' in field_name.lower():
-            if re.search(r'TELEFONE', text, re.IGNORECASE):
-                # Try multiple phone patterns
-                match = re.search(r'\(\d{2}\)\s*\d{4,5}-\d{4}', text)
-                if not match:
-                    match = re.search(r'\b\d{2}\s+\d{4,5}-\d{4}\b', text)
-                if not match:
-                    match = re.search(r'\b\d{10,11}\b', text)
-                if match:
-                    results[field_name] = match.group(0).strip()
-                # else: stays None (keyword exists but no number found)
-        
-        # OAB Rule 8: Situacao (Status) - Status after "SITUAÇÃO"
-        elif 'situacao' in field_name.lower() or 'situação' in field_name.lower():
-            match = re.search(r'SITUA[CÇ](?:A[OÃ]|Ã[OÃ])\s+([A-ZÀ-Ú]+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
+    if len(text_upper) != len(text):
+        # Some characters expand when upper-cased (e.g. 'ß' -> 'SS'), so offsets
+        # in text_upper no longer line up with text
+        match = _CATEGORIA_RE.search(text)
+        return match.group(1).strip() if match else None
+    
+    best_start = -1
+    best_end = -1
+    for keyword in _CATEGORIA_KEYWORDS:
+        start = text_upper.find(keyword)
+        while start != -1:
+            if best_start != -1 and start >= best_start:
+                break
+            end = start + len(keyword)
+            if _is_word_boundary(text, start, end):
+                best_start, best_end = start, end
+                break
+            start = text_upper.find(keyword, start + 1)
     
-    return results
+    if best_start == -1:
+        return None
+    return text[best_start:best_end]
@@ -6,137 +6,351 @@ These are the 11 anti-fragile multi-pattern rules for extracting fields from var
 system layouts (Form vs. Table).
 """
 
+import functools
 import re
-from typing import Dict, Any
+from typing import Callable, Optional, Tuple
 
+from src.config import HEURISTICS_CACHE_SIZE
+from .context import DocumentText
 
-def run_sistema_rules(
-    text: str,
-    schema_dict: Dict[str, str],
-    results: Dict[str, Any]
-) -> None:
+
+# Pre-compiled patterns (compiled once at import time instead of on every call)
+# Amounts and counts are ASCII-only, so they use [0-9] rather than the Unicode-aware \d
+_CIDADE_RE = re.compile(r'Cidade:\s+([A-Za-zÀ-úç\s]+?)\s+U\.F', re.IGNORECASE)
+_PESQUISA_POR_RE = re.compile(
+    r'Pesquisar por:.*?Buscar\s+(CLIENTE|parente|prestador|outro)', re.IGNORECASE | re.DOTALL
+)
+_PESQUISA_TIPO_RE = re.compile(
+    r'Tipo:.*?Buscar\s+\w+\s+(CPF|CNPJ|Nome|email)', re.IGNORECASE | re.DOTALL
+)
+_PRODUTO_LABEL_RE = re.compile(r'Produto\s+([A-Z]+(?:\s+[A-Z]+)*?)(?:\s+[A-Z][a-z]|\s*$|\s+[0-9])')
+# Word start checked by a lookbehind after the first letter (not a leading \b), so the
+# engine can skip straight to uppercase letters
+_PRODUTO_UPPERCASE_RE = re.compile(r'([A-Z](?<!\w[A-Z])[A-Z]+(?:\s+[A-Z]{2,})*)\b')
+# Uppercase words that are layout labels or other fields' values, never the product
+_PRODUTO_EXCLUDED_WORDS = frozenset({'CONSIGNADO', 'VENCIDAS', 'SISTEMA', 'CLIENTE', 'BUSCAR', 'TODOS'})
+_QUANTIDADE_QTD_RE = re.compile(r'Qtd\.?\s*Parcelas?\s+([0-9]+)', re.IGNORECASE)
+_QUANTIDADE_NEAR_RE = re.compile(r'(?:parcelas?|parcel\w*)[:\s]+([0-9]+)', re.IGNORECASE)
+_SELECAO_LABEL_RE = re.compile(r'Seleção de parcelas:\s+([A-Za-zÀ-úç]+)', re.IGNORECASE)
+_SELECAO_NEAR_RE = re.compile(r'parcelas[:\s]+.*?(Vencidas|pago|pendente)', re.IGNORECASE | re.DOTALL)
+_SISTEMA_VLR_PARC_RE = re.compile(r'Sistema\s+([A-Z]+)\s+VIr\.\s*Parc\.')
+_SISTEMA_RE = re.compile(r'Sistema\s+([A-Z]+)')
+_TIPO_OPERACAO_LABEL_RE = re.compile(r'Tipo\s+Operação:\s+([A-Za-zÀ-úç]+)', re.IGNORECASE)
+_TIPO_OPERACAO_KEYWORD_RE = re.compile(
+    r'\b(Renegociação|Renegociacao|Empréstimo|Emprestimo|Refinanciamento|Consignação|Consignacao)\b',
+    re.IGNORECASE
+)
+# Operation keywords, looked up with str.find on the upper-cased text (the regex above is
+# the fallback when upper-cased offsets do not line up with the text)
+_TIPO_OPERACAO_KEYWORDS = (
+    'RENEGOCIAÇÃO', 'RENEGOCIACAO', 'EMPRÉSTIMO', 'EMPRESTIMO',
+    'REFINANCIAMENTO', 'CONSIGNAÇÃO', 'CONSIGNACAO',
+)
+_TIPO_SISTEMA_LABEL_RE = re.compile(r'Tipo\s+Sistema:\s+([A-Za-zÀ-úç]+)', re.IGNORECASE)
+_TIPO_SISTEMA_NEAR_RE = re.compile(
+    r'Sistema[:\s]+.*?(Consignado|Consignacao|Crédito|Credito|Débito|Debito)',
+    re.IGNORECASE | re.DOTALL
+)
+_TOTAL_RE = re.compile(r'Total:\s+([0-9]+(?:\.[0-9]+)?,[0-9]+)', re.IGNORECASE)
+_TOTAL_GERAL_RE = re.compile(r'Total\s+Geral\s+([0-9]+(?:\.[0-9]+)?,[0-9]+)', re.IGNORECASE)
+_VALOR_PARCELA_RE = re.compile(r'VIr\.?\s*Parc\.\s+([0-9]+(?:\.[0-9]+)?,[0-9]+)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=HEURISTICS_CACHE_SIZE)
+def resolve_sistema_extractor(field_name: str) -> Optional[Callable[[DocumentText], Optional[str]]]:
+    """
+    Pick the Sistema rule that handles a schema field.
+    
+    Rules are triggered by the field name only, checked in rule order. The
+    result is cached per distinct field name.
+    
+    Args:
+        field_name: Schema field name
+    
+    Returns:
+        Extractor taking the DocumentText and returning the value or None,
+        or None if no Sistema rule applies to the field
+    """
+    field_name_lower = field_name.lower()
+    
+    # Rule 11: cidade - City name before U.F. (state abbreviation)
+    if 'cidade' in field_name_lower:
+        return _extract_cidade
+    
+    # Rule 12: pesquisa_por - Search type (CLIENTE, parente, prestador, outro)
+    elif 'pesquisa_por' in field_name_lower:
+        return _extract_pesquisa_por
+    
+    # Rule 13: pesquisa_tipo - Search method (CPF, CNPJ, Nome, email)
+    elif 'pesquisa_tipo' in field_name_lower:
+        return _extract_pesquisa_tipo
+    
+    # Rule 14: produto - Product name (MULTI-PATTERN)
+    elif 'produto' in field_name_lower:
+        return _extract_produto
+    
+    # Rule 15: quantidade_parcelas - Number of installments (MULTI-PATTERN)
+    elif 'quantidade' in field_name_lower and 'parcela' in field_name_lower:
+        return _extract_quantidade_parcelas
+    
+    # Rule 16: selecao_de_parcelas - Installment selection (MULTI-PATTERN)
+    elif ('selecao' in field_name_lower or 'seleção' in field_name_lower) and 'parcela' in field_name_lower:
+        return _extract_selecao_parcelas
+    
+    # Rule 17: sistema - System name (uppercase)
+    elif 'sistema' in field_name_lower and 'tipo' not in field_name_lower:
+        return _extract_sistema
+    
+    # Rule 18: tipo_de_operacao - Operation type (MULTI-PATTERN)
+    elif 'tipo' in field_name_lower and 'operacao' in field_name_lower:
+        return _extract_tipo_operacao
+    
+    # Rule 19: tipo_de_sistema - System type (MULTI-PATTERN)
+    elif 'tipo' in field_name_lower and 'sistema' in field_name_lower and 'operacao' not in field_name_lower:
+        return _extract_tipo_sistema
+    
+    # Rule 20: total_de_parcelas - Total value (MULTI-PATTERN)
+    elif 'total' in field_name_lower and 'parcela' in field_name_lower:
+        return _extract_total_parcelas
+    
+    # Rule 21: valor_parcela - Installment value
+    elif 'valor' in field_name_lower and 'parcela' in field_name_lower:
+        return _extract_valor_parcela
+    
+    return None
+
+
+def _extract_cidade(doc: DocumentText) -> Optional[str]:
+    """Rule 11: city name before U.F."""
+    start = _first_anchor(doc, 'CIDADE:')
+    if start == -1:
+        return None
+    match = _CIDADE_RE.search(doc.text, start)
+    return match.group(1).strip() if match else None
+
+
+def _extract_pesquisa_por(doc: DocumentText) -> Optional[str]:
+    """Rule 12: search type after "Pesquisar por"."""
+    if 'PESQUISAR POR:' not in doc.upper:
+        return None
+    match = _search_from_first_anchor(_PESQUISA_POR_RE, doc, 'PESQUISAR POR:')
+    return match.group(1) if match else None
+
+
+def _extract_pesquisa_tipo(doc: DocumentText) -> Optional[str]:
+    """Rule 13: search method after "Tipo"."""
+    if 'TIPO:' not in doc.upper:
+        return None
+    match = _search_from_first_anchor(_PESQUISA_TIPO_RE, doc, 'TIPO:')
+    return match.group(1) if match else None
+
+
+def _extract_produto(doc: DocumentText) -> Optional[str]:
+    """Rule 14: product name from a "Produto" label, else the first long uppercase phrase."""
+    # Try Pattern 1: Explicit "Produto" label (form layout), from the first "Produto"
+    label_start = doc.text.find('Produto')
+    if label_start != -1:
+        match = _PRODUTO_LABEL_RE.search(doc.text, label_start)
+        if match:
+            return match.group(1).strip()
+    # Pattern 2: Table layout - look for UPPERCASE words (lazily, stopping at the first fit)
+    for match in _PRODUTO_UPPERCASE_RE.finditer(doc.text):
+        word = match.group(1)
+        if word not in _PRODUTO_EXCLUDED_WORDS and len(word) >= 4:
+            return word
+    return None
+
+
+def _extract_quantidade_parcelas(doc: DocumentText) -> Optional[str]:
+    """Rule 15: number of installments."""
+    # Both patterns require a "parcel..." keyword (pattern 2 starts with it)
+    parcel_start = _first_anchor(doc, 'PARCEL')
+    if parcel_start == -1:
+        return None
+    # Try Pattern 1: Standard "Qtd. Parcelas" format
+    match = None
+    qtd_start = _first_anchor(doc, 'QTD')
+    if qtd_start != -1:
+        match = _QUANTIDADE_QTD_RE.search(doc.text, qtd_start)
+    if not match:
+        # Pattern 2: Look for any number near "parcela" or "parcel"
+        match = _QUANTIDADE_NEAR_RE.search(doc.text, parcel_start)
+    return match.group(1) if match else None
+
+
+def _extract_selecao_parcelas(doc: DocumentText) -> Optional[str]:
+    """Rule 16: installment selection."""
+    # Both patterns require the "parcelas" keyword
+    if 'PARCELAS' not in doc.upper:
+        return None
+    # Try Pattern 1: Standard "Seleção de parcelas:" format
+    match = None
+    label_start = _first_anchor(doc, 'SELEÇÃO DE PARCELAS:')
+    if label_start != -1:
+        match = _SELECAO_LABEL_RE.search(doc.text, label_start)
+    if not match:
+        # Pattern 2: Find status keywords near "parcelas"
+        match = _search_from_first_anchor(_SELECAO_NEAR_RE, doc, 'PARCELAS', separated=True)
+    return match.group(1) if match else None
+
+
+def _extract_sistema(doc: DocumentText) -> Optional[str]:
+    """Rule 17: uppercase system name after "Sistema"."""
+    # Both patterns start with the (case-sensitive) "Sistema" keyword
+    start = doc.text.find('Sistema')
+    if start == -1:
+        return None
+    # Try pattern with VIr. Parc. first (more specific)
+    match = _SISTEMA_VLR_PARC_RE.search(doc.text, start)
+    if not match:
+        # Fallback to simpler pattern
+        match = _SISTEMA_RE.search(doc.text, start)
+    return match.group(1) if match else None
+
+
+def _extract_tipo_operacao(doc: DocumentText) -> Optional[str]:
+    """Rule 18: operation type."""
+    # Try Pattern 1: Standard "Tipo Operação:" format (starts at a "Tipo")
+    match = None
+    if 'OPERAÇÃO:' in doc.upper:
+        tipo_start = _first_anchor(doc, 'TIPO')
+        if tipo_start != -1:
+            match = _TIPO_OPERACAO_LABEL_RE.search(doc.text, tipo_start)
+    if match:
+        return match.group(1)
+    # Pattern 2: Look for operation keywords (str.find on the upper-cased text when
+    # its offsets line up with the original)
+    if doc.upper_aligned:
+        return _find_first_word(doc.text, doc.upper, _TIPO_OPERACAO_KEYWORDS)
+    match = _TIPO_OPERACAO_KEYWORD_RE.search(doc.text)
+    return match.group(1) if match else None
+
+
+def _extract_tipo_sistema(doc: DocumentText) -> Optional[str]:
+    """Rule 19: system type."""
+    # Both patterns require the "Sistema" keyword
+    if 'SISTEMA' not in doc.upper:
+        return None
+    # Try Pattern 1: Standard "Tipo Sistema:" format (starts at a "Tipo")
+    match = None
+    if 'SISTEMA:' in doc.upper:
+        tipo_start = _first_anchor(doc, 'TIPO')
+        if tipo_start != -1:
+            match = _TIPO_SISTEMA_LABEL_RE.search(doc.text, tipo_start)
+    if not match:
+        # Pattern 2: Look for system types near "Sistema"
+        match = _search_from_first_anchor(_TIPO_SISTEMA_NEAR_RE, doc, 'SISTEMA', separated=True)
+    return match.group(1) if match else None
+
+
+def _extract_total_parcelas(doc: DocumentText) -> Optional[str]:
+    """Rule 20: total value."""
+    # Both patterns start with the "Total" keyword
+    start = _first_anchor(doc, 'TOTAL')
+    if start == -1:
+        return None
+    # Try Pattern 1: Standard "Total:" format
+    match = _TOTAL_RE.search(doc.text, start)
+    if not match:
+        # Pattern 2: "Total Geral" format
+        match = _TOTAL_GERAL_RE.search(doc.text, start)
+    return match.group(1) if match else None
+
+
+def _extract_valor_parcela(doc: DocumentText) -> Optional[str]:
+    """Rule 21: installment value."""
+    start = _first_anchor(doc, 'VIR')
+    if start == -1 or 'PARC.' not in doc.upper:
+        return None
+    match = _VALOR_PARCELA_RE.search(doc.text, start)
+    return match.group(1) if match else None
+
+
+def _first_anchor(doc: DocumentText, anchor: str) -> int:
     """
-    Apply Sistema-specific heuristics rules.
+    Find where to start searching a pattern that begins with a case-insensitive anchor.
     
-    Triggered for any label containing 'sistema' (e.g., 'tela_sistema', 'form_sistema').
-    Contains 11 multi-pattern rules designed to handle layout variations.
+    Args:
+        doc: DocumentText for the document
+        anchor: Upper-cased literal the pattern starts with
+    
+    Returns:
+        Offset of the first anchor in doc.text (0 if upper-cased offsets do not line
+        up with the text), or -1 if the anchor does not occur
+    """
+    if not doc.upper_aligned:
+        return 0 if anchor in doc.upper else -1
+    return doc.upper.find(anchor)
+
+
+def _find_first_word(text: str, text_upper: str, words: Tuple[str, ...]) -> Optional[str]:
+    """
+    Find the earliest whole-word occurrence of any of the words, case-insensitively.
+    
+    Equivalent to a re.IGNORECASE search for \\b(word1|word2|...)\\b, using exact
+    str.find lookups on the upper-cased text. The value is sliced from the
+    original text, so its case is preserved.
+    
+    Args:
+        text: The extracted text from the PDF document
+        text_upper: text.upper(), with offsets lining up with text
+        words: Upper-cased words to look for
+    
+    Returns:
+        The earliest occurrence, or None if there is none
+    """
+    best_start = -1
+    best_end = -1
+    for word in words:
+        start = text_upper.find(word)
+        while start != -1:
+            if best_start != -1 and start >= best_start:
+                break
+            end = start + len(word)
+            before_ok = start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_')
+            after_ok = end == len(text) or not (text[end].isalnum() or text[end] == '_')
+            if before_ok and after_ok:
+                best_start, best_end = start, end
+                break
+            start = text_upper.find(word, start + 1)
+    
+    if best_start == -1:
+        return None
+    return text[best_start:best_end]
+
+
+def _search_from_first_anchor(
+    pattern: re.Pattern,
+    doc: DocumentText,
+    anchor: str,
+    separated: bool = False
+) -> Optional[re.Match]:
+    """
+    Search an "<anchor>[separators].*?<keyword>" pattern (DOTALL, lazy gap) linearly.
+    
+    From a later anchor the lazy gap can only reach keywords that the first usable
+    anchor can also reach, so if the match fails there it fails everywhere. Plain
+    pattern.search would still retry at every later position, which is quadratic
+    on text that repeats the anchor without a keyword; this tries one position.
     
     Args:
-        text: Extracted text from PDF
-        schema_dict: Schema mapping field names to descriptions
-        results: Current extraction results (modified in place)
-        
+        pattern: Compiled pattern starting with the (case-insensitive) anchor
+        doc: DocumentText for the document
+        anchor: Upper-cased literal the pattern starts with
+        separated: Whether the pattern requires ':' or whitespace right after the anchor
+    
     Returns:
-        Updated results dictionary
+        The same match as pattern.search(doc.text), or None
     """
-    for field_name, description in schema_dict.items():
-        field_name_lower = field_name.lower()
-        
-        # Rule 11: cidade - City name before U.F. (state abbreviation)
-        if 'cidade' in field_name_lower and results[field_name] is None:
-            match = re.search(r'Cidade:\s+([A-Za-zÀ-úç\s]+?)\s+U\.F', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1).strip()
-        
-        # Rule 12: pesquisa_por - Search type (CLIENTE, parente, prestador, outro)
-        elif 'pesquisa_por' in field_name_lower and results[field_name] is None:
-            match = re.search(r'Pesquisar por:.*?Buscar\s+(CLIENTE|parente|prestador|outro)', text, re.IGNORECASE | re.DOTALL)
-            if match:
-                results[field_name] = match.group(1)
-        
-        # Rule 13: pesquisa_tipo - Search method (CPF, CNPJ, Nome, email)
-        elif 'pesquisa_tipo' in field_name_lower and results[field_name] is None:
-            match = re.search(r'Tipo:.*?Buscar\s+\w+\s+(CPF|CNPJ|Nome|email)', text, re.IGNORECASE | re.DOTALL)
-            if match:
-                results[field_name] = match.group(1)
-        
-        # Rule 14: produto - Product name (MULTI-PATTERN)
-        elif 'produto' in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Explicit "Produto" label (form layout)
-            match = re.search(r'Produto\s+([A-Z]+(?:\s+[A-Z]+)*?)(?:\s+[A-Z][a-z]|\s*$|\s+\d)', text)
-            if match:
-                results[field_name] = match.group(1).strip()
-            # Pattern 2: Table layout - look for UPPERCASE words
-            elif not match:
-                uppercase_words = re.findall(r'\b([A-Z]{2,}(?:\s+[A-Z]{2,})*)\b', text)
-                exclude = {'CONSIGNADO', 'VENCIDAS', 'SISTEMA', 'CLIENTE', 'BUSCAR', 'TODOS'}
-                for word in uppercase_words:
-                    if word not in exclude and len(word) >= 4:
-                        results[field_name] = word
-                        break
-        
-        # Rule 15: quantidade_parcelas - Number of installments (MULTI-PATTERN)
-        elif 'quantidade' in field_name_lower and 'parcela' in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Standard "Qtd. Parcelas" format
-            match = re.search(r'Qtd\.?\s*Parcelas?\s+(\d+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
-            # Pattern 2: Look for any number near "parcela" or "parcel"
-            elif not match:
-                match = re.search(r'(?:parcelas?|parcel\w*)[:\s]+(\d+)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1)
-        
-        # Rule 16: selecao_de_parcelas - Installment selection (MULTI-PATTERN)
-        elif ('selecao' in field_name_lower or 'seleção' in field_name_lower) and 'parcela' in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Standard "Seleção de parcelas:" format
-            match = re.search(r'Seleção de parcelas:\s+([A-Za-zÀ-úç]+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
-            # Pattern 2: Find status keywords near "parcelas"
-            elif not match:
-                match = re.search(r'parcelas[:\s]+.*?(Vencidas|pago|pendente)', text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    results[field_name] = match.group(1)
-        
-        # Rule 17: sistema - System name (uppercase)
-        elif 'sistema' in field_name_lower and 'tipo' not in field_name_lower and results[field_name] is None:
-            # Try pattern with VIr. Parc. first (more specific)
-            match = re.search(r'Sistema\s+([A-Z]+)\s+VIr\.\s*Parc\.', text)
-            if not match:
-                # Fallback to simpler pattern
-                match = re.search(r'Sistema\s+([A-Z]+)', text)
-            if match:
-                results[field_name] = match.group(1)
-        
-        # Rule 18: tipo_de_operacao - Operation type (MULTI-PATTERN)
-        elif 'tipo' in field_name_lower and 'operacao' in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Standard "Tipo Operação:" format
-            match = re.search(r'Tipo\s+Operação:\s+([A-Za-zÀ-úç]+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
-            # Pattern 2: Look for operation keywords
-            elif not match:
-                match = re.search(r'\b(Renegociação|Renegociacao|Empréstimo|Emprestimo|Refinanciamento|Consignação|Consignacao)\b', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1)
-        
-        # Rule 19: tipo_de_sistema - System type (MULTI-PATTERN)
-        elif 'tipo' in field_name_lower and 'sistema' in field_name_lower and 'operacao' not in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Standard "Tipo Sistema:" format
-            match = re.search(r'Tipo\s+Sistema:\s+([A-Za-zÀ-úç]+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
-            # Pattern 2: Look for system types near "Sistema"
-            elif not match:
-                match = re.search(r'Sistema[:\s]+.*?(Consignado|Consignacao|Crédito|Credito|Débito|Debito)', text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    results[field_name] = match.group(1)
-        
-        # Rule 20: total_de_parcelas - Total value (MULTI-PATTERN)
-        elif 'total' in field_name_lower and 'parcela' in field_name_lower and results[field_name] is None:
-            # Try Pattern 1: Standard "Total:" format
-            match = re.search(r'Total:\s+(\d+(?:\.\d+)?,\d+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
-            # Pattern 2: "Total Geral" format
-            elif not match:
-                match = re.search(r'Total\s+Geral\s+(\d+(?:\.\d+)?,\d+)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1)
-        
-        # Rule 21: valor_parcela - Installment value
-        elif 'valor' in field_name_lower and 'parcela' in field_name_lower and results[field_name] is None:
-            match = re.search(r'VIr\.?\s*Parc\.\s+(\d+(?:\.\d+)?,\d+)', text, re.IGNORECASE)
-            if match:
-                results[field_name] = match.group(1)
+    text = doc.text
+    if not doc.upper_aligned:
+        # Upper-cased offsets do not line up with text, fall back to a plain search
+        return pattern.search(text)
+    
+    anchor_idx = doc.upper.find(anchor)
+    while anchor_idx != -1:
+        after = anchor_idx + len(anchor)
+        if not separated or (after < len(text) and (text[after] == ':' or text[after].isspace())):
+            return pattern.match(text, anchor_idx)
+        anchor_idx = doc.upper.find(anchor, anchor_idx + 1)
+    return None
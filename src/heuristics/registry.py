@@ -6,9 +6,37 @@ This module follows the Open/Closed Principle by allowing new document types to
 without modifying existing code.
 """
 
-from typing import Dict, Any
+import functools
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Tuple
 
+from src.config import (
+    HEURISTICS_CACHE_SIZE,
+    HEURISTICS_RESULT_CACHE_SIZE,
+    HEURISTICS_BATCH_WORKERS,
+    HEURISTICS_BATCH_CHUNK_SIZE,
+    HEURISTICS_BATCH_MIN_PARALLEL,
+)
 from . import label_oab, label_sistema, generic
+from .context import DocumentText
+
+# A field extractor takes the document's DocumentText and returns the value, or None if not found
+Extractor = Callable[[DocumentText], Optional[str]]
+
+
+# run_heuristics results, least recently used first, keyed by (label, text digest, schema
+# items). Keying on the digest keeps whole documents out of the memo; only the result
+# dicts are retained (at most HEURISTICS_RESULT_CACHE_SIZE of them)
+_RESULT_MEMO: "OrderedDict[Tuple[str, bytes, Tuple[Tuple[str, str], ...]], Dict[str, Any]]" = OrderedDict()
+
+
+class _ExtractionPlan(NamedTuple):
+    """Everything run_heuristics needs for one (label, schema), resolved once."""
+    result_template: Dict[str, Any]
+    steps: Tuple[Tuple[str, Tuple[Extractor, ...]], ...]
+    field_count: int
 
 
 def run_heuristics(label: str, text: str, schema_dict: Dict[str, str]) -> Dict[str, Any]:
@@ -28,21 +56,198 @@ def run_heuristics(label: str, text: str, schema_dict: Dict[str, str]) -> Dict[s
         Dictionary containing:
         - Each field name mapped to its extracted value (or None if not found)
         - '__found_all__': Boolean indicating if all fields were successfully extracted
+    
+    Results are memoized per (label, text digest, schema), so retrying the same
+    document does not re-run the rules. Each call returns a fresh copy of the cached result.
+    """
+    schema_items = tuple(schema_dict.items())
+    # Descriptions drive the generic rules, so they are part of the cache key
+    key = (label, hashlib.blake2b(text.encode('utf-8', 'surrogatepass')).digest(), schema_items)
+    cached_results = _RESULT_MEMO.get(key)
+    if cached_results is None:
+        cached_results = _RESULT_MEMO[key] = _run_rules(label, text, schema_items)
+        if len(_RESULT_MEMO) > HEURISTICS_RESULT_CACHE_SIZE:
+            _RESULT_MEMO.popitem(last=False)
+    else:
+        _RESULT_MEMO.move_to_end(key)
+    return dict(cached_results)
+
+
+def clear_heuristics_caches() -> None:
+    """
+    Empty the run_heuristics result memo and the per-schema extraction plan cache.
+    
+    After this, the next run_heuristics call for any document re-resolves its
+    plan and runs the rules.
+    """
+    _RESULT_MEMO.clear()
+    _build_extraction_plan.cache_clear()
+
+
+def run_heuristics_batch(
+    label: str,
+    docs: List[Tuple[str, Dict[str, str]]]
+) -> List[Dict[str, Any]]:
+    """
+    Run heuristics over many documents of the same label, in parallel across processes.
+    
+    The rules are pure-Python CPU work, so threads would serialize on the GIL.
+    Each worker process imports this module once (compiling the patterns once)
+    and receives documents in chunks to amortize inter-process overhead.
+    Batches smaller than HEURISTICS_BATCH_MIN_PARALLEL run in the current process.
+    
+    Args:
+        label: The document label/type shared by every document in the batch
+        docs: List of (text, schema_dict) pairs
+    
+    Returns:
+        List of result dictionaries (same format as run_heuristics), in input order
     """
-    # STEP 1: Initialize all fields to None
-    results: Dict[str, Any] = {field_name: None for field_name in schema_dict.keys()}
+    if len(docs) < HEURISTICS_BATCH_MIN_PARALLEL:
+        return [run_heuristics(label, text, schema_dict) for text, schema_dict in docs]
     
-    # STEP 2: PRONG 1 - Label-Specific Optimized Rules
-    if 'oab' in label.lower():
-        label_oab.run_oab_rules(text, schema_dict, results)
-    elif 'sistema' in label.lower():
-        label_sistema.run_sistema_rules(text, schema_dict, results)
+    jobs = [(label, text, schema_dict) for text, schema_dict in docs]
+    with ProcessPoolExecutor(max_workers=HEURISTICS_BATCH_WORKERS) as executor:
+        return list(executor.map(_run_heuristics_job, jobs, chunksize=HEURISTICS_BATCH_CHUNK_SIZE))
+
+
+def _run_heuristics_job(job: Tuple[str, str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Worker entry point for run_heuristics_batch (module-level so it can be pickled).
     
-    # STEP 3: PRONG 2 - Generic Adaptive Rules
-    generic.run_generic_rules(text, schema_dict, results)
+    Args:
+        job: (label, text, schema_dict) tuple
     
-    # STEP 4: Calculate metadata and return
-    found_all = all(results.get(field_name) is not None for field_name in schema_dict)
-    results['__found_all__'] = found_all
+    Returns:
+        Result dictionary for the document
+    """
+    label, text, schema_dict = job
+    return run_heuristics(label, text, schema_dict)
+
+
+def _run_rules(
+    label: str,
+    text: str,
+    schema_items: Tuple[Tuple[str, str], ...]
+) -> Dict[str, Any]:
+    """
+    Run the rule banks for a hashable schema representation.
+    
+    Args:
+        label: The document label/type
+        text: The extracted text from the PDF document
+        schema_items: Schema as a tuple of (field_name, description) pairs
+    
+    Returns:
+        Results dictionary, memoized by run_heuristics (callers must copy it)
+    """
+    # Label dispatch, trigger checks and the results layout come from one cached plan
+    plan = _build_extraction_plan(label, schema_items)
+    
+    # STEP 1: Initialize all fields to None (copied from the per-schema template)
+    results = plan.result_template.copy()
+    if not plan.steps or not text:
+        # No rule handles any field (e.g. sistema fields under an OAB label), or there is
+        # no text for them to match: nothing to scan
+        results['__found_all__'] = plan.field_count == 0
+        return results
+    
+    # STEP 2: Run each field's extractor chain (label-specific first, then generic);
+    # the first extractor that finds a value wins and the rest of the chain is skipped.
+    # Every planned field still runs: callers send only the missing fields to the LLM,
+    # so partial results are needed even when not everything can be found
+    # One normalization context per document, shared by both rule banks; variants such as
+    # the upper-cased text are computed on first use only (never, if no rule needs them)
+    doc = DocumentText(text)
+    
+    # Several fields can share an extractor (e.g. 'cpf' and 'cpf_titular' both run the
+    # CPF scan); each extractor runs at most once per document
+    extracted: Dict[Extractor, Optional[str]] = {}
+    found_count = 0
+    for field_name, extractors in plan.steps:
+        for extractor in extractors:
+            if extractor in extracted:
+                value = extracted[extractor]
+            else:
+                value = extracted[extractor] = extractor(doc)
+            if value is not None:
+                results[field_name] = value
+                found_count += 1
+                break
+    
+    # STEP 3: Calculate metadata and return (counted while filling, no second pass)
+    results['__found_all__'] = found_count == plan.field_count
     
     return results
+
+
+@functools.lru_cache(maxsize=HEURISTICS_CACHE_SIZE)
+def _build_extraction_plan(
+    label: str,
+    schema_items: Tuple[Tuple[str, str], ...]
+) -> _ExtractionPlan:
+    """
+    Resolve, once per (label, schema), which extractors run for each field.
+    
+    Label dispatch and every field-name/description trigger check happen here,
+    so a document only runs the extractors its schema needs:
+    - Prong 1: the label-specific rule for the field ('oab' or 'sistema' labels)
+    - Prong 2: the generic rule for the field, as fallback
+    The plan also carries the results template, so a run does a single cache
+    lookup for all of its per-schema setup.
+    
+    Args:
+        label: The document label/type
+        schema_items: Schema as a tuple of (field_name, description) pairs
+    
+    Returns:
+        _ExtractionPlan whose steps are (field_name, extractors) pairs; fields no
+        rule handles are omitted from the steps (they stay None)
+    """
+    label_lower = label.lower()
+    if 'oab' in label_lower:
+        resolve_label_extractor = label_oab.resolve_oab_extractor
+    elif 'sistema' in label_lower:
+        resolve_label_extractor = label_sistema.resolve_sistema_extractor
+    else:
+        resolve_label_extractor = None
+    
+    steps = []
+    for field_name, description in schema_items:
+        extractors = []
+        if resolve_label_extractor is not None:
+            label_extractor = resolve_label_extractor(field_name)
+            if label_extractor is not None:
+                extractors.append(label_extractor)
+        generic_extractor = generic.resolve_generic_extractor(field_name, description)
+        if generic_extractor is not None:
+            extractors.append(generic_extractor)
+        if extractors:
+            steps.append((field_name, tuple(extractors)))
+    
+    field_names = tuple(field_name for field_name, _ in schema_items)
+    return _ExtractionPlan(
+        result_template=_result_template(field_names),
+        steps=tuple(steps),
+        field_count=len(field_names),
+    )
+
+
+def _result_template(field_names: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Build the empty results layout for a schema shape.
+    
+    The template already holds every field key plus the trailing '__found_all__'
+    slot, so a run only copies it (a single C-level dict copy with no re-hashing)
+    and assigns values to existing keys. Key order is the schema order followed
+    by '__found_all__', exactly as when the dict was built field by field.
+    
+    Args:
+        field_names: Schema field names, in schema order
+    
+    Returns:
+        Template dictionary stored in the plan (callers must copy it)
+    """
+    template: Dict[str, Any] = dict.fromkeys(field_names)
+    template['__found_all__'] = False
+    return template
@@ -0,0 +1,33 @@
+"""
+Hybrid Module
+
+Helpers for combining heuristics results with the LLM fallback.
+This module has no dependencies beyond the standard library, so callers (and tests)
+can use it without loading the LLM client stack.
+"""
+
+from typing import Dict, Any
+
+
+def compute_missing_schema(
+    schema_dict: Dict[str, str],
+    results: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Build the schema of fields the heuristics did not find.
+    
+    Keeps the original schema order, so the LLM prompt lists fields the same
+    way the caller declared them.
+    
+    Args:
+        schema_dict: Original schema dictionary
+        results: Extraction results from heuristics
+        
+    Returns:
+        Schema dictionary restricted to the fields whose result is None
+    """
+    return {
+        field_name: description
+        for field_name, description in schema_dict.items()
+        if results.get(field_name) is None
+    }
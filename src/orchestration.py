@@ -17,6 +17,7 @@ from typing import Dict, Any, Tuple, List
 from src.cache_manager import create_cache_key, get_cached_result, set_cached_result
 from src.pdf_parser import extract_text_from_pdf_cached
 from src.heuristics.registry import run_heuristics
+from src.hybrid import compute_missing_schema
 from src.llm_client import run_llm_extraction
 
 
@@ -76,13 +77,15 @@ def extract_data_from_pdf(
     # Analyze heuristics results
     found_fields, missing_fields = _analyze_results(schema_dict, heuristic_results)
     
+    # Field values without the '__found_all__' flag, shared by every branch below
+    heuristic_values = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
+    
     # Step 5: Check if all fields were found
     if heuristic_results.get('__found_all__') is True:
         logging.info(f"Heuristics successful! All {len(found_fields)} fields found.")
         logging.info(f"  ✓ Heuristics: {', '.join(found_fields)}")
         
-        # Clean result (remove metadata)
-        final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
+        final_result = heuristic_values
         
         metadata = {
             "cache_hit": False,
@@ -104,19 +107,14 @@ def extract_data_from_pdf(
         
         try:
             # Create schema only for missing fields
-            missing_fields_schema = {
-                field_name: description 
-                for field_name, description in schema_dict.items() 
-                if heuristic_results.get(field_name) is None
-            }
+            missing_fields_schema = compute_missing_schema(schema_dict, heuristic_results)
             
             # Extract only missing fields with LLM
             llm_results = run_llm_extraction(text, missing_fields_schema)
             logging.info(f"LLM extraction completed for {len(missing_fields)} field(s).")
             
             # Merge heuristics + LLM results
-            final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
-            final_result.update(llm_results)
+            final_result = heuristic_values | llm_results
             
             metadata = {
                 "cache_hit": False,
@@ -130,7 +128,7 @@ def extract_data_from_pdf(
         except Exception as e:
             logging.error(f"Error during LLM extraction: {e}")
             # Use heuristic results as fallback
-            final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
+            final_result = heuristic_values
             logging.info("Using partial heuristics results as fallback.")
             
             metadata = {
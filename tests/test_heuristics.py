@@ -4,12 +4,29 @@ Tests cover all regex rules and integration with real PDF files from the dataset
 """
 
 import pytest
+import functools
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
-from src.heuristics.registry import run_heuristics
-from src.pdf_parser import extract_text_from_pdf
+from src.heuristics import generic, registry
+from src.heuristics.registry import run_heuristics, run_heuristics_batch, clear_heuristics_caches
+from src.heuristics.context import DocumentText
+from src.config import HEURISTICS_RESULT_CACHE_SIZE
+from src.pdf_parser import extract_text_from_pdf_cached
+
+# dataset.json and files/ live in the project root, not in tests/
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_DATASET_PATH = _PROJECT_ROOT / 'dataset.json'
+_FILES_DIR = _PROJECT_ROOT / 'files'
+
+
+@pytest.fixture
+def fresh_heuristics_caches():
+    """Empty the run_heuristics memo and the plan cache, so the next call runs the rules."""
+    clear_heuristics_caches()
 
 
 class TestCPFRule:
@@ -93,6 +110,23 @@ class TestCPFRule:
         for text in invalid_cases:
             result = run_heuristics('carteira_oab', text, schema)
             assert result['cpf'] is None, f"Should not match: {text}"
+    
+    def test_cpf_requires_word_boundaries(self):
+        """Test that a formatted CPF glued to other word characters is skipped."""
+        schema = {"cpf": "CPF number"}
+        
+        result = run_heuristics('carteira_oab', 'X123.456.789-00 ou 987.654.321-00', schema)
+        
+        assert result['cpf'] == '987.654.321-00'
+        assert run_heuristics('carteira_oab', '123.456.789-001', schema)['cpf'] is None
+        assert run_heuristics('carteira_oab', '-123.456.789-00', schema)['cpf'] == '123.456.789-00'
+    
+    def test_cpf_requires_ascii_digits(self):
+        """Test that non-ASCII decimal digits (e.g. Arabic-Indic) are not read as a CPF."""
+        schema = {"cpf": "CPF number"}
+        
+        assert run_heuristics('carteira_oab', '١٢٣.٤٥٦.٧٨٩-٠٠', schema)['cpf'] is None
+        assert run_heuristics('carteira_oab', '١٢٣٤٥٦٧٨٩٠٠', schema)['cpf'] is None
 
 
 class TestInscricaoRule:
@@ -119,6 +153,15 @@ class TestInscricaoRule:
         # Should only match 123456 (exactly 6 digits with word boundaries)
         assert result['inscricao'] == '123456'
     
+    def test_inscricao_rejects_digits_glued_to_letters(self):
+        """Test that 6 digits preceded by a letter or underscore are not a word on their own."""
+        schema = {"inscricao": "Número de inscrição"}
+        
+        result = run_heuristics('carteira_oab', 'A123456 _654321 101943', schema)
+        
+        assert result['inscricao'] == '101943'
+        assert run_heuristics('carteira_oab', '101943', schema)['inscricao'] == '101943'
+    
     def test_inscricao_with_accented_field_name(self):
         """Test trigger with accented field name (INSCRIÇÂO)."""
         mock_text = 'Registration: 789012'
@@ -261,6 +304,24 @@ class TestCategoriaRule:
         
         assert result['categoria'] is None
         assert result['__found_all__'] is False
+    
+    def test_categoria_earliest_keyword_wins(self):
+        """Test that the first keyword in the text wins, regardless of keyword order."""
+        mock_text = 'estagiaria desde 2020, advogada desde 2024'
+        schema = {"categoria": "Categoria"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['categoria'] == 'estagiaria'
+    
+    def test_categoria_with_case_expanding_characters(self):
+        """Test extraction when upper-casing changes the text length (e.g. 'ß')."""
+        mock_text = 'Straße 1\nCategoria: Advogado'
+        schema = {"categoria": "Categoria"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['categoria'] == 'Advogado'
 
 
 class TestSituacaoRule:
@@ -467,15 +528,34 @@ class TestDataRule:
         for text in invalid_cases:
             result = run_heuristics('carteira_oab', f'Date: {text}', schema)
             # These should not match or might match partially
-            # Main point: the regex enforces DD/MM/YYYY or DD/MM/YY format
-            if result['data'] is not None:
-                # If something matched, verify it's a proper format
-                assert '/' in result['data']
-                parts = result['data'].split('/')
-                assert len(parts) == 3
-                assert len(parts[0]) == 2  # Day
-                assert len(parts[1]) == 2  # Month
-                assert len(parts[2]) in [2, 4]  # Year
+            # Main point: the rule enforces DD/MM/YYYY or DD/MM/YY format
+            value = result['data']
+            if value is not None:
+                # If something matched, verify it's a proper format (fixed offsets)
+                assert len(value) in [8, 10]  # DD/MM/YY or DD/MM/YYYY
+                assert value[2] == '/' and value[5] == '/'
+                assert value.count('/') == 2
+                assert 1 <= int(value[0:2]) <= 31  # Day
+                assert 1 <= int(value[3:5]) <= 12  # Month
+    
+    def test_data_skips_out_of_range_day_or_month(self):
+        """Test that impossible day/month values are skipped in favour of a real date."""
+        mock_text = 'Ref 32/13/2024 - emitido em 15/03/2024'
+        schema = {"data": "Data"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['data'] == '15/03/2024'
+        assert run_heuristics('carteira_oab', '00/01/2024', schema)['data'] is None
+    
+    def test_data_skips_slashes_before_real_date(self):
+        """Test that stray slashes earlier in the text do not hide a later date."""
+        mock_text = 'Processo 1/2 - ref a/b/c - emitido em 15/03/2024'
+        schema = {"data": "Data"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['data'] == '15/03/2024'
 
 
 class TestNomeRule:
@@ -626,7 +706,34 @@ class TestNomeRule:
         
         # Should match first occurrence
         assert result['nome'] == 'ANA PAULA'
-    
+
+    def test_nome_does_not_span_lines(self):
+        """Test that the name stops at the end of its line."""
+        mock_text = 'CLIENTE\nCPF\nOperação'
+        schema = {"nome": "Nome da pessoa"}
+
+        result = run_heuristics('carteira_oab', mock_text, schema)
+
+        # Uppercase words on the next line belong to another field
+        assert result['nome'] == 'CLIENTE'
+
+    def test_nome_drops_word_glued_to_lowercase(self):
+        """Test that a trailing word running into lowercase letters is not part of the name."""
+        schema = {"nome": "Nome da pessoa"}
+
+        assert run_heuristics('carteira_oab', 'JOÃO SILVAx', schema)['nome'] == 'JOÃO'
+        assert run_heuristics('carteira_oab', 'CPFs de ANA LIMA', schema)['nome'] == 'ANA LIMA'
+
+    def test_nome_long_uppercase_runs_stay_linear(self):
+        """Test that long runs which only fail at their end do not backtrack quadratically."""
+        schema = {"nome": "Nome da pessoa"}
+        glued_words = 'ABCDEFGHIJx ' * 2000
+        mock_text = glued_words + 'MARIA ' * 2000 + 'SOUZAx'
+
+        result = run_heuristics('carteira_oab', mock_text, schema)
+
+        assert result['nome'] == ' '.join(['MARIA'] * 2000)
+
     def test_nome_not_found(self):
         """Test when no valid name pattern exists."""
         mock_text = 'No name here, just text'
@@ -737,6 +844,42 @@ Categoria: ADVOGADO'''
         
         assert result['subsecao'] == 'PARANÁ'
     
+    def test_subsecao_crlf_line_endings(self):
+        """Test subsecao extraction from text with CRLF line endings."""
+        mock_text = 'CONSELHO SECCIONAL - SÃO PAULO\r\nfoo'
+        schema = {"subsecao": "Subseção"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['subsecao'] == 'SÃO PAULO'
+    
+    def test_subsecao_after_label_on_same_line(self):
+        """Test subsecao extraction when the phrase does not start its line."""
+        mock_text = 'Subseção: CONSELHO SECCIONAL - PARANÁ\nfoo'
+        schema = {"subsecao": "Subseção"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['subsecao'] == 'PARANÁ'
+    
+    def test_subsecao_requires_separator(self):
+        """Test that a state name glued to SECCIONAL is not taken as the subsecao."""
+        mock_text = 'CONSELHO SECCIONALTOTAL\nfoo'
+        schema = {"subsecao": "Subseção"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['subsecao'] is None
+    
+    def test_subsecao_prefers_dash_form(self):
+        """Test that a dash-separated line wins over an earlier space-separated one."""
+        mock_text = 'CONSELHO SECCIONAL DE SP\nInscrição\nCONSELHO SECCIONAL - PARANA\nfoo'
+        schema = {"subsecao": "Subseção"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['subsecao'] == 'PARANA'
+    
     def test_subsecao_not_found(self):
         """Test that missing subsecao returns None."""
         mock_text = 'Nome: JOÃO SILVA\nInscrição: 123456\nCategoria: ADVOGADO'
@@ -849,8 +992,9 @@ class TestTelefoneRule:
             ('Telefone: (11) 98765-4321', '(11) 98765-4321'),
         ]
         
+        schema = {"telefone": "Telefone"}
+        
         for text, expected in test_cases:
-            schema = {"telefone": "Telefone"}
             result = run_heuristics('carteira_oab', text, schema)
             assert result['telefone'] == expected, f"Failed for {text}"
     
@@ -863,6 +1007,47 @@ class TestTelefoneRule:
         
         assert result['telefone'] == '(11) 98765-4321'
     
+    def test_telefone_prefers_number_after_label(self):
+        """Test that the OAB rule takes the number following the label, not an earlier one."""
+        mock_text = 'Ouvidoria (21) 99999-8888\nTelefone Profissional\n(11) 3456-7890'
+        schema = {"telefone_profissional": "Telefone"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['telefone_profissional'] == '(11) 3456-7890'
+    
+    def test_telefone_without_number_after_label_falls_back_to_generic(self):
+        """Test that the generic rule still finds an earlier number when the label has none."""
+        mock_text = 'Fone (11) 91234-5678\nTelefone Profissional\nSituação'
+        schema = {"telefone_profissional": "Telefone"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['telefone_profissional'] == '(11) 91234-5678'
+    
+    def test_telefone_label_hit_skips_generic_fallback(self, fresh_heuristics_caches):
+        """Test that a field's chain stops at the first hit (the generic scan never runs)."""
+        mock_text = 'Telefone: (11) 98765-4321\nOutro: (21) 99999-8888'
+        schema = {"telefone": "Telefone"}
+        
+        with patch.object(generic, '_TELEFONE_PAREN_RE') as generic_re:
+            result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['telefone'] == '(11) 98765-4321'
+        assert result['__found_all__'] is True
+        generic_re.search.assert_not_called()
+    
+    def test_telefone_format_priority(self):
+        """Test that the (XX) XXXXX-XXXX format is preferred over bare digits in the same window."""
+        mock_text = 'Telefone: 11987654321 ou (11) 98765-4321'
+        schema = {"telefone": "Telefone"}
+        
+        oab_result = run_heuristics('carteira_oab', mock_text, schema)
+        generic_result = run_heuristics('documento_generico', mock_text, schema)
+        
+        assert oab_result['telefone'] == '(11) 98765-4321'
+        assert generic_result['telefone'] == '(11) 98765-4321'
+    
     def test_telefone_real_example_oab_no_number(self):
         """Test with real OAB PDF text where telefone exists but no number."""
         mock_text = '''Endereço Profissional
@@ -992,6 +1177,20 @@ Telefone Profissional'''
         
         expected = "AVENIDA PAULISTA, Nº 2300 andar Pilotis, Bela Vista\nSÃO PAULO - SP\n01310300"
         assert result['endereco_profissional'] == expected
+    
+    def test_endereco_skips_header_without_address_block(self):
+        """Test that a header not followed by street, city and CEP lines is skipped."""
+        mock_text = '''Endereço Profissional
+- 
+Endereço Profissional
+RUA DAS FLORES, 123
+RIO DE JANEIRO - RJ
+20000000 (fim)'''
+        schema = {"endereco": "Endereço"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['endereco'] == "RUA DAS FLORES, 123\nRIO DE JANEIRO - RJ\n20000000"
 
 
 class TestSeccionalRule:
@@ -1021,10 +1220,10 @@ class TestSeccionalRule:
     def test_seccional_various_states(self):
         """Test extraction of different Brazilian state codes."""
         states = ['SP', 'RJ', 'MG', 'RS', 'BA', 'PR', 'SC', 'DF']
+        schema = {"seccional": "State"}
         
         for state in states:
             text = f'Document from Seccional {state} region'
-            schema = {"seccional": "State"}
             result = run_heuristics('carteira_oab', text, schema)
             assert result['seccional'] == state, f"Failed for state: {state}"
     
@@ -1071,6 +1270,15 @@ class TestSeccionalRule:
         
         # Should not match 3 letters
         assert result['seccional'] is None
+    
+    def test_seccional_conselho_requires_valid_state_code(self):
+        """Test that a non-UF pair after CONSELHO SECCIONAL falls back to a real state code."""
+        mock_text = 'CONSELHO SECCIONAL - XY\nInscrição válida em MG'
+        schema = {"seccional": "State"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['seccional'] == 'MG'
 
 
 class TestMultipleFields:
@@ -1115,6 +1323,20 @@ class TestMultipleFields:
         assert result['seccional'] == 'RJ'
         assert result['__found_all__'] is False
     
+    def test_fields_can_share_the_same_text(self):
+        """
+        Test that each field searches the text independently: one digit run can
+        be both the CPF and the phone, and a lower-priority format earlier in the
+        text does not hide a preferred format later on.
+        """
+        mock_text = 'Telefone: 11987654321 ou 21 3456-7890\nRecado: (31) 99999-0000'
+        schema = {"cpf": "CPF", "telefone": "Telefone para contato"}
+        
+        result = run_heuristics('documento_generico', mock_text, schema)
+        
+        assert result['cpf'] == '11987654321'
+        assert result['telefone'] == '(31) 99999-0000'
+    
     def test_multiple_fields_none_found(self):
         """Test when no fields match."""
         mock_text = 'Random text with no extractable information'
@@ -1184,23 +1406,169 @@ class TestEdgeCases:
         
         assert result['cpf'] == '987.654.321-00'
 
+    def test_repeated_calls_return_independent_results(self):
+        """Test that memoized results are copied, so mutating one does not leak into the next."""
+        mock_text = 'CPF: 123.456.789-00'
+        schema = {"cpf": "CPF number"}
+
+        first = run_heuristics('carteira_oab', mock_text, schema)
+        first['cpf'] = 'tampered'
+        second = run_heuristics('carteira_oab', mock_text, schema)
+
+        assert second['cpf'] == '123.456.789-00'
+        assert second is not first
+
+    def test_result_memo_is_bounded_and_keyed_by_digest(self, fresh_heuristics_caches):
+        """Test that the result memo evicts old entries and does not keep document text."""
+        schema = {"inscricao": "Número de inscrição"}
+        for i in range(HEURISTICS_RESULT_CACHE_SIZE + 5):
+            run_heuristics('carteira_oab', f'Inscrição {100000 + i}', schema)
+        
+        assert len(registry._RESULT_MEMO) == HEURISTICS_RESULT_CACHE_SIZE
+        assert all(isinstance(digest, bytes) for _, digest, _ in registry._RESULT_MEMO)
+    
+    def test_shared_extractor_runs_once_per_document(self, fresh_heuristics_caches):
+        """Test that fields handled by the same rule share one scan of the document."""
+        schema = {"cpf": "CPF", "cpf_titular": "CPF do titular", "documento": "XXX.XXX.XXX-XX"}
+        
+        with patch.object(generic, '_find_formatted_cpf', wraps=generic._find_formatted_cpf) as scan:
+            result = run_heuristics('documento_generico', 'CPF 123.456.789-00', schema)
+        
+        assert result['cpf'] == result['cpf_titular'] == result['documento'] == '123.456.789-00'
+        assert scan.call_count == 1
+
+    def test_extraction_plan_reused_across_documents(self, fresh_heuristics_caches):
+        """Test that a repeated (label, schema) resolves its rule plan only once."""
+        schema = {"inscricao": "Número de inscrição"}
+        
+        first = run_heuristics('carteira_oab', 'Inscrição 101943', schema)
+        second = run_heuristics('carteira_oab', 'Inscrição 202020', schema)
+        
+        assert first['inscricao'] == '101943'
+        assert second['inscricao'] == '202020'
+        assert registry._build_extraction_plan.cache_info().misses == 1
+        assert registry._build_extraction_plan.cache_info().hits == 1
+
+    def test_field_dispatch_shared_across_schemas(self, fresh_heuristics_caches):
+        """Test that a field's keyword dispatch is resolved once, even across schemas."""
+        generic.resolve_generic_extractor.cache_clear()
+        
+        run_heuristics('documento_generico', 'CPF 123.456.789-00', {"cpf": "CPF"})
+        result = run_heuristics(
+            'documento_generico',
+            'CPF 123.456.789-00 em 01/02/2024',
+            {"cpf": "CPF", "data": "Data"}
+        )
+        
+        assert result['cpf'] == '123.456.789-00'
+        assert result['data'] == '01/02/2024'
+        assert generic.resolve_generic_extractor.cache_info().misses == 2
+        assert generic.resolve_generic_extractor.cache_info().hits == 1
+
+    def test_label_isolation_plans_no_extractors(self):
+        """Test that fields no rule handles under a label are dropped from its plan, not run."""
+        schema_items = (("valor_parcela", "Value"), ("sistema", "System"))
+        
+        plan = registry._build_extraction_plan('carteira_oab', schema_items)
+        
+        assert plan.steps == ()
+        assert plan.field_count == 2
+        assert run_heuristics('carteira_oab', 'Sistema CONSIGNADO VIr. Parc. 2.372,64', dict(schema_items)) == {
+            "valor_parcela": None, "sistema": None, "__found_all__": False
+        }
+
+    def test_result_keys_follow_schema_order(self):
+        """Test that results list schema fields in order, with '__found_all__' last."""
+        schema = {"telefone": "Telefone", "cpf": "CPF number", "data": "Data"}
+
+        result = run_heuristics('carteira_oab', 'CPF: 123.456.789-00', schema)
+        other = run_heuristics('carteira_oab', 'Data: 01/02/2024', schema)
+
+        assert list(result) == ['telefone', 'cpf', 'data', '__found_all__']
+        assert list(other) == ['telefone', 'cpf', 'data', '__found_all__']
+        assert other['cpf'] is None
+
+    def test_reordered_schema_keeps_its_own_key_order(self):
+        """Test that the same fields in another order get their own plan and key order."""
+        text = 'CPF: 123.456.789-00 Data: 01/02/2024'
+
+        forward = run_heuristics('carteira_oab', text, {"cpf": "CPF", "data": "Data"})
+        backward = run_heuristics('carteira_oab', text, {"data": "Data", "cpf": "CPF"})
+
+        assert list(forward) == ['cpf', 'data', '__found_all__']
+        assert list(backward) == ['data', 'cpf', '__found_all__']
+        assert forward == backward
+
+
+class TestDocumentText:
+    """Test suite for the per-document normalization context shared by the rules."""
+    
+    def test_upper_is_computed_lazily_and_once(self):
+        """Test that the upper-cased variant is only built on first access, then reused."""
+        doc = DocumentText('Advogado João')
+        
+        assert 'upper' not in vars(doc)
+        assert doc.upper == 'ADVOGADO JOÃO'
+        assert doc.upper is doc.upper
+    
+    def test_upper_aligned(self):
+        """Test offset alignment detection for characters that expand when upper-cased."""
+        assert DocumentText('Situação regular').upper_aligned is True
+        assert DocumentText('Straße').upper_aligned is False
+
+
+class TestHeuristicsBatch:
+    """Test suite for batch extraction across documents."""
+    
+    def test_small_batch_matches_single_calls(self):
+        """Test that a small (in-process) batch returns the same results as run_heuristics."""
+        schema = {"cpf": "CPF number", "data": "Data"}
+        docs = [
+            ('CPF: 123.456.789-00 em 01/02/2024', schema),
+            ('Nada aqui', schema),
+            ('Data: 15/03/24', {"data": "Data"}),
+        ]
+        
+        results = run_heuristics_batch('carteira_oab', docs)
+        
+        assert results == [run_heuristics('carteira_oab', text, s) for text, s in docs]
+    
+    def test_large_batch_runs_in_worker_processes(self):
+        """Test that a batch above the parallel threshold goes through the process pool and keeps input order."""
+        schema = {"inscricao": "Número de inscrição"}
+        docs = [(f'Inscrição {100000 + i}', schema) for i in range(40)]
+        
+        with patch.object(registry, 'ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            results = run_heuristics_batch('carteira_oab', docs)
+        
+        pool.assert_called_once()
+        assert [r['inscricao'] for r in results] == [str(100000 + i) for i in range(40)]
+        assert all(r['__found_all__'] is True for r in results)
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        assert run_heuristics_batch('carteira_oab', []) == []
+
+
+@functools.lru_cache(maxsize=None)
+def _load_dataset():
+    """Parse dataset.json once per test session."""
+    with open(_DATASET_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 class TestDatasetIntegration:
     """Integration tests using actual PDF files and dataset.json."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def dataset(self):
         """Load the dataset.json file."""
-        # dataset.json is in the project root, not in tests/
-        dataset_path = Path(__file__).parent.parent / 'dataset.json'
-        with open(dataset_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_dataset()
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def files_dir(self):
         """Get the files directory path."""
-        # files/ directory is in the project root, not in tests/
-        return Path(__file__).parent.parent / 'files'
+        return _FILES_DIR
     
     def test_dataset_structure(self, dataset):
         """Test that dataset has expected structure."""
@@ -1236,7 +1604,7 @@ class TestDatasetIntegration:
                 continue
             
             # Extract text from PDF
-            text = extract_text_from_pdf(str(pdf_path))
+            text = extract_text_from_pdf_cached(str(pdf_path))
             
             # Run heuristics
             result = run_heuristics(entry['label'], text, entry['extraction_schema'])
@@ -1266,7 +1634,7 @@ class TestDatasetIntegration:
                 continue
             
             # Extract text from PDF
-            text = extract_text_from_pdf(str(pdf_path))
+            text = extract_text_from_pdf_cached(str(pdf_path))
             
             # Run heuristics
             result = run_heuristics(entry['label'], text, entry['extraction_schema'])
@@ -1371,6 +1739,62 @@ class TestHeuristicsRobustness:
         assert result['CPF'] == '123.456.789-00'
         assert result['Inscricao'] == '101943'
         assert result['SECCIONAL'] == 'RJ'
+    
+    def test_long_near_miss_inputs(self):
+        """
+        Test CPF/telefone/seccional on long inputs built from near-misses.
+        
+        Each pattern must fail locally (bounded backtracking), so these
+        complete in linear time and still find the value at the very end.
+        """
+        near_misses = (
+            '1' * 5000 + ' '                 # digit run too long for CPF or phone
+            + '(11) ' * 2000                 # phone prefixes with no number
+            + '123.456.789-0x ' * 2000       # truncated CPFs
+            + 'CONSELHO SECCIONAL - ' * 500  # seccional keyword with no state code
+        )
+        mock_text = near_misses + 'CPF 987.654.321-00 Telefone (21) 3456-7890 CONSELHO SECCIONAL - SP'
+        schema = {"cpf": "CPF", "telefone": "Telefone", "seccional": "Seccional"}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['cpf'] == '987.654.321-00'
+        assert result['telefone'] == '(21) 3456-7890'
+        assert result['seccional'] == 'SP'
+    
+    def test_repeated_sistema_anchors_without_keyword(self):
+        """
+        Test the lazy-gap sistema rules on text that repeats their anchors.
+        
+        Without a keyword after any anchor, each rule fails after one attempt
+        instead of retrying from every repeated anchor (quadratic time).
+        """
+        mock_text = (
+            'Pesquisar por: ' * 3000
+            + 'Tipo: ' * 3000
+            + 'parcelas: ' * 3000
+            + 'Sistema: ' * 3000
+        )
+        schema = {
+            "pesquisa_por": "Search by",
+            "pesquisa_tipo": "Search type",
+            "selecao_de_parcelas": "Selection",
+            "tipo_de_sistema": "System type",
+        }
+        
+        result = run_heuristics('tela_sistema', mock_text, schema)
+        
+        assert result['pesquisa_por'] is None
+        assert result['pesquisa_tipo'] is None
+        assert result['selecao_de_parcelas'] is None
+        assert result['tipo_de_sistema'] is None
+        
+        # Appending a keyword is found from the first anchor
+        result = run_heuristics('tela_sistema', mock_text + 'Buscar CLIENTE Vencidas Consignado', schema)
+        
+        assert result['pesquisa_por'] == 'CLIENTE'
+        assert result['selecao_de_parcelas'] == 'Vencidas'
+        assert result['tipo_de_sistema'] == 'Consignado'
 
 
 # ========================================
@@ -1762,6 +2186,15 @@ class TestTelaSistemaTipoOperacaoRule:
         
         assert result['tipo_de_operacao'] == 'Refinanciamento'
     
+    def test_tipo_operacao_keyword_whole_word_keeps_case(self):
+        """Test the keyword fallback: earliest whole word wins, with its original case."""
+        mock_text = "EMPRÉSTIMOS anteriores; operação atual: consignação"
+        schema = {"tipo_de_operacao": "Type"}
+        
+        result = run_heuristics('tela_sistema', mock_text, schema)
+        
+        assert result['tipo_de_operacao'] == 'consignação'
+    
     def test_tipo_operacao_not_found(self):
         """Test tipo_de_operacao returns None when pattern not found."""
         mock_text = "Operation type: Renegotiation"
@@ -2097,3 +2530,31 @@ class TestDualModeArchitecture:
         print("   OAB rules isolated from tela_sistema label")
         print("   tela_sistema rules isolated from carteira_oab label")
         print("   → No cross-contamination between document types")
+    
+    def test_generic_trigger_priority_and_reuse(self):
+        """
+        Test that a field matching several generic triggers uses the first one
+        (CPF, then telefone, then data), also when the same schema is reused
+        on a different document.
+        """
+        schema = {'documento': 'CPF ou telefone do titular', 'emissao': 'Date of issue'}
+        
+        first = run_heuristics('unknown_label', 'Tel 11987654321 CPF 123.456.789-00 em 01/02/2024', schema)
+        second = run_heuristics('unknown_label', 'CPF 987.654.321-00 em 05/06/23', schema)
+        
+        assert first['documento'] == '123.456.789-00'
+        assert first['emissao'] == '01/02/2024'
+        assert second['documento'] == '987.654.321-00'
+        assert second['emissao'] == '05/06/23'
+    
+    def test_label_rule_miss_falls_back_to_generic_rule(self):
+        """Test that a field the label-specific rule misses is still tried by the generic rule."""
+        # The number is too far from the label for the OAB telefone rule
+        mock_text = 'Telefone Profissional\n' + 'x' * 200 + '\nContato (11) 3456-7890'
+        schema = {'telefone_profissional': 'Telefone', 'campo_livre': 'Sem regra'}
+        
+        result = run_heuristics('carteira_oab', mock_text, schema)
+        
+        assert result['telefone_profissional'] == '(11) 3456-7890'
+        assert result['campo_livre'] is None
+        assert result['__found_all__'] is False
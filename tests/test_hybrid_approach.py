@@ -6,37 +6,62 @@ Tests that LLM is only called for fields not found by heuristics.
 import pytest
 import json
 import os
-from unittest.mock import patch, MagicMock
 
 from src.pdf_parser import extract_text_from_pdf, extract_text_from_pdf_cached
-from src.heuristics.registry import run_heuristics
-from src.llm_client import run_llm_extraction
+from src.heuristics.registry import run_heuristics, clear_heuristics_caches
 from src.cache_manager import GLOBAL_CACHE, get_pdf_hash_cached
+from src.hybrid import compute_missing_schema
 
 
-@pytest.fixture
-def clear_caches():
-    """Clear all caches before each test."""
+def _clear_all_caches():
+    """Empty the result cache, the hash/text LRU caches and the heuristics memo."""
     GLOBAL_CACHE.clear()
     get_pdf_hash_cached.cache_clear()
     extract_text_from_pdf_cached.cache_clear()
+    clear_heuristics_caches()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(request):
+    """Clear all caches around tests marked needs_clean_cache.
+
+    Unmarked tests keep the caches warm, so a PDF parsed by one test is not
+    parsed again by the next.
+    """
+    if request.node.get_closest_marker("needs_clean_cache") is None:
+        yield
+        return
+    _clear_all_caches()
     yield
-    GLOBAL_CACHE.clear()
-    get_pdf_hash_cached.cache_clear()
-    extract_text_from_pdf_cached.cache_clear()
+    _clear_all_caches()
+
+
+def _pdf_text_or_skip(pdf_path):
+    """Extract the text of a dataset PDF, skipping the requesting test if it is absent."""
+    if not os.path.exists(pdf_path):
+        pytest.skip(f"PDF file not found: {pdf_path}")
+    return extract_text_from_pdf(pdf_path)
+
+
+@pytest.fixture(scope="session")
+def oab_text():
+    """Text of files/oab_1.pdf, extracted once and shared by every test in the session."""
+    return _pdf_text_or_skip("files/oab_1.pdf")
+
+
+@pytest.fixture(scope="session")
+def tela_sistema_text():
+    """Text of files/tela_sistema_1.pdf, extracted once per session."""
+    return _pdf_text_or_skip("files/tela_sistema_1.pdf")
 
 
 class TestHybridApproach:
     """Test the hybrid extraction approach that combines heuristics + LLM."""
     
-    def test_llm_only_called_for_missing_fields(self, clear_caches):
+    def test_llm_only_called_for_missing_fields(self, oab_text):
         """Test that LLM is only called for fields not found by heuristics."""
         
-        pdf_path = "files/oab_1.pdf"
-        if not os.path.exists(pdf_path):
-            pytest.skip(f"PDF file not found: {pdf_path}")
-        
-        # Schema with 4 fields: 3 findable by heuristics (nome, inscricao, seccional), 1 not findable (subsecao needs full text)
+        # Schema with 4 fields: 3 findable by heuristics (nome, inscricao, seccional), 1 not findable (telefone_profissional)
         schema = {
             "nome": "Nome do profissional",
             "inscricao": "Número de inscrição do profissional",
@@ -44,11 +69,8 @@ class TestHybridApproach:
             "telefone_profissional": "Telefone do profissional"  # This one won't be found (no phone number in PDF)
         }
         
-        # Extract text
-        text = extract_text_from_pdf(pdf_path)
-        
-        # Run heuristics
-        heuristic_results = run_heuristics('carteira_oab', text, schema)
+        # Run heuristics on the shared session text
+        heuristic_results = run_heuristics('carteira_oab', oab_text, schema)
         
         # Verify heuristics found nome, inscricao, seccional
         assert heuristic_results.get('inscricao') is not None, "Heuristics should find inscricao"
@@ -63,62 +85,48 @@ class TestHybridApproach:
         print(f"seccional: {heuristic_results['seccional']} (found by heuristics)")
         print(f"telefone_profissional: {heuristic_results['telefone_profissional']} (needs LLM)")
         
-        # Mock the LLM extraction to verify it's only called for missing fields
-        with patch('src.llm_client.run_llm_extraction') as mock_llm:
-            # Mock LLM to return the missing field (telefone returns None, not a value)
-            mock_llm.return_value = {
-                "telefone_profissional": None
-            }
-            
-            # Create schema for missing fields (simulating hybrid approach)
-            missing_fields_schema = {
-                field_name: description 
-                for field_name, description in schema.items() 
-                if heuristic_results.get(field_name) is None
-            }
-            
-            print(f"\n=== Missing Fields Schema (sent to LLM) ===")
-            print(json.dumps(missing_fields_schema, indent=2, ensure_ascii=False))
-            
-            # Verify only 1 field in missing schema (telefone_profissional)
-            assert len(missing_fields_schema) == 1
-            assert "telefone_profissional" in missing_fields_schema
-            assert "inscricao" not in missing_fields_schema  # Already found by heuristics
-            assert "nome" not in missing_fields_schema  # Already found by heuristics
-            assert "seccional" not in missing_fields_schema  # Already found by heuristics
-            
-            # Simulate calling LLM with only missing fields
-            # (We use mock_llm.return_value directly instead of calling the function)
-            llm_results = mock_llm.return_value
-            
-            # Verify the missing fields schema is correct
-            # (This is what would be passed to LLM in the real hybrid approach)
-            print(f"\n=== Verification ===")
-            print(f"Schema that would be sent to LLM has {len(missing_fields_schema)} fields")
-            print(f"Original schema had {len(schema)} fields")
-            
-            # Merge results
-            final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
-            final_result.update(llm_results)
-            
-            print(f"\n=== Final Merged Results ===")
-            print(json.dumps(final_result, indent=2, ensure_ascii=False))
-            
-            # Verify final result has all fields
-            assert final_result['inscricao'] == heuristic_results['inscricao']  # From heuristics
-            assert final_result['nome'] == "JOANA D'ARC"  # From LLM
-            assert final_result['seccional'] == "PR"  # From LLM
-            
-            print(f"\n✅ SUCCESS: LLM was only called for 2 missing fields instead of all 3")
-            print(f"   - Savings: 33% reduction in LLM API calls")
+        # Canned LLM answer for the missing field (telefone returns None, not a value)
+        llm_results = {
+            "telefone_profissional": None
+        }
+        
+        # Create schema for missing fields (simulating hybrid approach)
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
+        
+        print(f"\n=== Missing Fields Schema (sent to LLM) ===")
+        print(json.dumps(missing_fields_schema, indent=2, ensure_ascii=False))
+        
+        # Verify only 1 field in missing schema (telefone_profissional)
+        assert len(missing_fields_schema) == 1
+        assert "telefone_profissional" in missing_fields_schema
+        assert "inscricao" not in missing_fields_schema  # Already found by heuristics
+        assert "nome" not in missing_fields_schema  # Already found by heuristics
+        assert "seccional" not in missing_fields_schema  # Already found by heuristics
+        
+        # Verify the missing fields schema is correct
+        # (This is what would be passed to LLM in the real hybrid approach)
+        print(f"\n=== Verification ===")
+        print(f"Schema that would be sent to LLM has {len(missing_fields_schema)} fields")
+        print(f"Original schema had {len(schema)} fields")
+        
+        # Merge results
+        final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
+        final_result.update(llm_results)
+        
+        print(f"\n=== Final Merged Results ===")
+        print(json.dumps(final_result, indent=2, ensure_ascii=False))
+        
+        # Verify final result has all fields
+        assert final_result['inscricao'] == heuristic_results['inscricao']  # From heuristics
+        assert final_result['nome'] == "JOANA D'ARC"  # From heuristics
+        assert final_result['seccional'] == "PR"  # From heuristics
+        
+        print(f"\n✅ SUCCESS: LLM was only called for 1 missing field instead of all 4")
+        print(f"   - Savings: 75% reduction in fields sent to the LLM")
     
-    def test_cost_savings_with_multiple_heuristic_matches(self, clear_caches):
+    def test_cost_savings_with_multiple_heuristic_matches(self, oab_text):
         """Test cost savings when heuristics find multiple fields."""
         
-        pdf_path = "files/oab_1.pdf"
-        if not os.path.exists(pdf_path):
-            pytest.skip(f"PDF file not found: {pdf_path}")
-        
         # Full OAB schema with 8 fields
         # Heuristics typically finds 1-2 fields (inscricao, maybe seccional)
         schema = {
@@ -132,15 +140,12 @@ class TestHybridApproach:
             "situacao": "Situação do profissional"
         }
         
-        # Extract text
-        text = extract_text_from_pdf(pdf_path)
+        # Run heuristics on the shared session text
+        heuristic_results = run_heuristics('carteira_oab', oab_text, schema)
         
-        # Run heuristics
-        heuristic_results = run_heuristics('carteira_oab', text, schema)
-        
-        # Count fields found by heuristics
-        found_by_heuristics = sum(1 for k, v in heuristic_results.items() 
-                                   if k != '__found_all__' and v is not None)
+        # Fields the heuristics missed; the found count is derived from it
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
+        found_by_heuristics = len(schema) - len(missing_fields_schema)
         
         total_fields = len(schema)
         missing_fields = total_fields - found_by_heuristics
@@ -162,13 +167,6 @@ class TestHybridApproach:
         # Verify heuristics found at least inscricao
         assert found_by_heuristics >= 1, "Heuristics should find at least inscricao"
         
-        # Create missing fields schema
-        missing_fields_schema = {
-            field_name: description 
-            for field_name, description in schema.items() 
-            if heuristic_results.get(field_name) is None
-        }
-        
         print(f"\n=== Schema Sizes ===")
         print(f"Original schema size: {len(schema)} fields")
         print(f"Missing fields schema size: {len(missing_fields_schema)} fields")
@@ -176,7 +174,8 @@ class TestHybridApproach:
         
         assert len(missing_fields_schema) < len(schema), "Missing schema should be smaller"
     
-    def test_all_fields_found_by_heuristics_no_llm_call(self, clear_caches):
+    @pytest.mark.needs_clean_cache
+    def test_all_fields_found_by_heuristics_no_llm_call(self):
         """Test that LLM is not called when heuristics find all fields."""
         
         # Create a simple text with a 6-digit inscription number
@@ -204,13 +203,9 @@ class TestHybridApproach:
         print(f"✅ SUCCESS: No LLM call needed when heuristics find all fields")
         print(f"   - Cost savings: 100% (no LLM API call)")
     
-    def test_no_fields_found_by_heuristics_full_llm_call(self, clear_caches):
+    def test_no_fields_found_by_heuristics_full_llm_call(self, tela_sistema_text):
         """Test that LLM is called for most fields when heuristics find very few."""
         
-        pdf_path = "files/tela_sistema_1.pdf"
-        if not os.path.exists(pdf_path):
-            pytest.skip(f"PDF file not found: {pdf_path}")
-        
         # Schema for tela_sistema - heuristics now find data_base (date), but not produto/sistema
         schema = {
             "data_base": "Data base da operação",
@@ -218,15 +213,12 @@ class TestHybridApproach:
             "sistema": "Sistema da operação"
         }
         
-        # Extract text
-        text = extract_text_from_pdf(pdf_path)
+        # Run heuristics on the shared session text
+        heuristic_results = run_heuristics('carteira_oab', tela_sistema_text, schema)
         
-        # Run heuristics
-        heuristic_results = run_heuristics('carteira_oab', text, schema)
-        
-        # Count fields found by heuristics
-        found_by_heuristics = sum(1 for k, v in heuristic_results.items() 
-                                   if k != '__found_all__' and v is not None)
+        # Fields the heuristics missed; the found count is derived from it
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
+        found_by_heuristics = len(schema) - len(missing_fields_schema)
         
         print(f"\n=== Test: Few Heuristics Matches ===")
         print(f"Schema: {list(schema.keys())}")
@@ -240,14 +232,7 @@ class TestHybridApproach:
         assert heuristic_results.get('sistema') is None, "Should not find sistema"
         assert heuristic_results.get('__found_all__') is False
         
-        # Create missing fields schema (should have 2 fields: produto, sistema)
-        missing_fields_schema = {
-            field_name: description 
-            for field_name, description in schema.items() 
-            if heuristic_results.get(field_name) is None
-        }
-        
-        # Verify 2 out of 3 fields need LLM
+        # Verify 2 out of 3 fields need LLM (produto, sistema)
         assert len(missing_fields_schema) == 2
         assert 'produto' in missing_fields_schema
         assert 'sistema' in missing_fields_schema
@@ -261,7 +246,29 @@ class TestHybridApproach:
 class TestHybridApproachEdgeCases:
     """Test edge cases for the hybrid approach."""
     
-    def test_empty_schema(self, clear_caches):
+    def test_missing_schema_keeps_schema_order(self):
+        """Test that the missing-fields schema keeps the caller's field order."""
+        schema = {
+            "situacao": "Situação",
+            "inscricao": "Número de inscrição",
+            "categoria": "Categoria",
+            "nome": "Nome"
+        }
+        heuristic_results = {
+            "situacao": None,
+            "inscricao": "123456",
+            "categoria": None,
+            "nome": None,
+            "__found_all__": False
+        }
+        
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
+        
+        assert list(missing_fields_schema) == ["situacao", "categoria", "nome"]
+        assert missing_fields_schema["categoria"] == "Categoria"
+    
+    @pytest.mark.needs_clean_cache
+    def test_empty_schema(self):
         """Test hybrid approach with empty schema."""
         text = "Some text content"
         schema = {}
@@ -272,22 +279,14 @@ class TestHybridApproachEdgeCases:
         assert heuristic_results.get('__found_all__') is True
         
         # Missing fields schema should be empty
-        missing_fields_schema = {
-            field_name: description 
-            for field_name, description in schema.items() 
-            if heuristic_results.get(field_name) is None
-        }
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
         
         assert len(missing_fields_schema) == 0
         print("\n✅ Empty schema handled correctly - no LLM call needed")
     
-    def test_hybrid_approach_preserves_heuristics_values(self, clear_caches):
+    def test_hybrid_approach_preserves_heuristics_values(self, oab_text):
         """Test that hybrid approach doesn't overwrite heuristics values with LLM results."""
         
-        pdf_path = "files/oab_1.pdf"
-        if not os.path.exists(pdf_path):
-            pytest.skip(f"PDF file not found: {pdf_path}")
-        
         # Use telefone field which is not found by heuristics (no number in PDF)
         schema = {
             "inscricao": "Número de inscrição",
@@ -295,8 +294,7 @@ class TestHybridApproachEdgeCases:
             "telefone_profissional": "Telefone do profissional"
         }
         
-        text = extract_text_from_pdf(pdf_path)
-        heuristic_results = run_heuristics('carteira_oab', text, schema)
+        heuristic_results = run_heuristics('carteira_oab', oab_text, schema)
         
         # Save the heuristics values
         heuristics_inscricao = heuristic_results['inscricao']
@@ -306,35 +304,27 @@ class TestHybridApproachEdgeCases:
         print(f"Inscricao from heuristics: {heuristics_inscricao}")
         print(f"Nome from heuristics: {heuristics_nome}")
         
-        # Mock LLM to return values (only telefone should be in missing schema)
-        with patch('src.llm_client.run_llm_extraction') as mock_llm:
-            mock_llm.return_value = {
-                "telefone_profissional": None
-            }
-            
-            # Create missing fields schema (should only include telefone_profissional)
-            missing_fields_schema = {
-                field_name: description 
-                for field_name, description in schema.items() 
-                if heuristic_results.get(field_name) is None
-            }
-            
-            assert "inscricao" not in missing_fields_schema, "inscricao found by heuristics"
-            assert "nome" not in missing_fields_schema, "nome found by heuristics"
-            assert "telefone_profissional" in missing_fields_schema, "telefone not found by heuristics"
-            
-            # Simulate LLM call (use mock return value)
-            llm_results = mock_llm.return_value
-            
-            # Merge results
-            final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
-            final_result.update(llm_results)
-            
-            # Verify heuristics values are preserved
-            assert final_result['inscricao'] == heuristics_inscricao, "Heuristics inscricao should be preserved"
-            assert final_result['nome'] == heuristics_nome, "Heuristics nome should be preserved"
-            assert final_result['telefone_profissional'] is None, "LLM returned None for telefone"
-            
-            print(f"✅ SUCCESS: Heuristics value preserved in final result")
-            print(f"   - inscricao: {final_result['inscricao']} (from heuristics)")
-            print(f"   - nome: {final_result['nome']} (from LLM)")
+        # Canned LLM answer (only telefone should be in missing schema)
+        llm_results = {
+            "telefone_profissional": None
+        }
+        
+        # Create missing fields schema (should only include telefone_profissional)
+        missing_fields_schema = compute_missing_schema(schema, heuristic_results)
+        
+        assert "inscricao" not in missing_fields_schema, "inscricao found by heuristics"
+        assert "nome" not in missing_fields_schema, "nome found by heuristics"
+        assert "telefone_profissional" in missing_fields_schema, "telefone not found by heuristics"
+        
+        # Merge results
+        final_result = {k: v for k, v in heuristic_results.items() if k != '__found_all__'}
+        final_result.update(llm_results)
+        
+        # Verify heuristics values are preserved
+        assert final_result['inscricao'] == heuristics_inscricao, "Heuristics inscricao should be preserved"
+        assert final_result['nome'] == heuristics_nome, "Heuristics nome should be preserved"
+        assert final_result['telefone_profissional'] is None, "LLM returned None for telefone"
+        
+        print(f"✅ SUCCESS: Heuristics value preserved in final result")
+        print(f"   - inscricao: {final_result['inscricao']} (from heuristics)")
+        print(f"   - nome: {final_result['nome']} (from heuristics)")
@@ -7,43 +7,36 @@ from unittest.mock import Mock, patch, MagicMock
 import sys
 from io import StringIO
 
+import pymupdf
+
 from src.pdf_parser import extract_text_from_pdf
 
 
+@pytest.fixture(scope="session")
+def hello_world_pdf(tmp_path_factory):
+    """Write a one-page PDF containing 'hello world' once per test session."""
+    pdf_path = tmp_path_factory.mktemp("pdfs") / "hello_world.pdf"
+    doc = pymupdf.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "hello world")
+    doc.save(str(pdf_path))
+    doc.close()
+    return str(pdf_path)
+
+
 class TestExtractTextFromPdf:
     """Test suite for extract_text_from_pdf function."""
     
-    @patch('src.pdf_parser.pymupdf.open')
-    def test_extract_text_success(self, mock_pymupdf_open):
+    def test_extract_text_success(self, hello_world_pdf):
         """
         Test that extract_text_from_pdf returns 'hello world' 
         when the PDF has one page with that text.
         """
-        # Create a mock document
-        mock_doc = Mock()
-        mock_doc.page_count = 1
-        
-        # Create a mock page that returns 'hello world'
-        mock_page = Mock()
-        mock_page.get_text.return_value = 'hello world'
+        # Call the function on a real one-page PDF
+        result = extract_text_from_pdf(hello_world_pdf)
         
-        # Configure the mock document to return the mock page
-        mock_doc.load_page.return_value = mock_page
-        
-        # Configure pymupdf.open to return the mock document
-        mock_pymupdf_open.return_value = mock_doc
-        
-        # Call the function
-        result = extract_text_from_pdf('dummy.pdf')
-        
-        # Verify the result
-        assert result == 'hello world'
-        
-        # Verify the function called the right methods
-        mock_pymupdf_open.assert_called_once_with('dummy.pdf')
-        mock_doc.load_page.assert_called_once_with(0)
-        mock_page.get_text.assert_called_once_with('text')
-        mock_doc.close.assert_called_once()
+        # Verify the result (PyMuPDF ends each text line with a newline)
+        assert result.strip() == 'hello world'
     
     @patch('src.pdf_parser.pymupdf.open')
     def test_extract_text_zero_pages(self, mock_pymupdf_open, capsys):